@@ -1,16 +1,35 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 from .routes import router
 from pydantic import BaseModel
-from typing import List
+from typing import List, Literal, Optional, Union
+import asyncio
+import threading
 import uuid
-import pandas as pd
 import os
+import numpy as np
+from src import registry
 from src.simulate_team_with_offseason_moves import (
-    TeamRoster,
     process_fa_signing,
     process_trade,
-    simulate_next_season
+    apply_moves,
+    evaluate_trades,
+    league_trial_chunks,
+    league_standings
+)
+from src.league_state import LeagueState, roster_delta
+from .session_store import create_session_store, SessionConflict
+from .simulation_cache import create_simulation_cache, roster_fingerprint
+from .simulation_pool import (
+    create_simulation_pool,
+    PoolFull,
+    PoolTimeout,
+    PoolUnavailable,
+    simulate_team_job,
+    simulate_league_job,
+    find_trades_job,
+    optimize_fa_job
 )
 
 # uvicorn backend.app.main:app --reload --port 8001
@@ -26,14 +45,82 @@ app.add_middleware(
 
 app.include_router(router)
 
-session_state = {}
+MAX_SIMULATION_TRIALS = 5000
+
+# Sessions only store the moves made on top of the shared, read-only league (registry "league_base")
+session_store = create_session_store()
+
+# Simulations, trade searches and FA optimization run in this process pool, off the API's GIL
+simulation_pool = create_simulation_pool()
+# /simulate_league chunks beyond the pool's workers would only queue behind each other
+MAX_SIMULATION_PROCESSES = max(simulation_pool.processes, 1)
+# Seeded /simulate results by roster fingerprint, seed and trials
+simulation_cache = create_simulation_cache()
+
+# WARMUP: "background" (default) loads data and models after startup so /health answers
+# immediately, "sync" loads them before serving, "off" loads each artifact on first use
+WARMUP = os.environ.get("WARMUP", "background")
+
+@app.on_event("startup")
+def warmup_artifacts():
+    if WARMUP == "sync":
+        registry.warmup()
+        simulation_pool.start(prewarm=True)
+    elif WARMUP == "background":
+        threading.Thread(target=registry.warmup, daemon=True).start()
+        threading.Thread(target=simulation_pool.start, kwargs={"prewarm": True}, daemon=True).start()
+
+@app.on_event("shutdown")
+def stop_simulation_pool():
+    simulation_pool.shutdown()
 
-script_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(os.path.dirname(script_dir))
-player_data = pd.read_csv(os.path.join(project_root, "data", "player_stats_2024-25_with_salaries.csv"))
-player_data["SALARY"] = round(player_data["SALARY"] / 1000000, 1)
-fa_df = pd.read_csv(os.path.join(project_root, "data", "fa_player.csv"))
-fa_list = fa_df['PLAYER_NAME'].tolist()
+def save_session(session_id, state):
+    """
+    Save a session read earlier in this request. Returns None, or a 409 response when another
+    request saved it in between (the client reloads and retries).
+    """
+    try:
+        session_store.put(session_id, state)
+    except SessionConflict:
+        return JSONResponse(status_code=409, content={"error": "Session was modified by another request"})
+    return None
+
+async def run_simulation(job, *args):
+    """
+    Run a simulation job in the pool: 429 with Retry-After when its queue is full, 503 with
+    Retry-After when a worker died under it, 504 when the job outlives the pool's timeout.
+    """
+    try:
+        return await simulation_pool.run(job, *args)
+    except PoolFull as e:
+        return JSONResponse(status_code=429, content={"error": str(e)}, headers={"Retry-After": str(e.retry_after)})
+    except PoolUnavailable as e:
+        return JSONResponse(status_code=503, content={"error": str(e)}, headers={"Retry-After": str(e.retry_after)})
+    except PoolTimeout as e:
+        return JSONResponse(status_code=504, content={"error": str(e)})
+
+async def simulate_team(state, team, trials, seed):
+    """
+    /simulate result for a session team. Seeded results are memoized: the same players and
+    salaries with the same seed and trials come from the cache without touching the pool.
+    Pool errors come back as a JSONResponse.
+    """
+    if seed is None:
+        return await run_simulation(simulate_team_job, state.to_delta(), team, trials, seed)
+
+    key = (roster_fingerprint(state.team(team).roster), seed, trials)
+    # Checked before the lookup, so a retrained model empties the cache and recycles the workers
+    model_version = simulation_pool.check_models()
+    result = simulation_cache.get(key, model_version)
+    if result is None:
+        result = await run_simulation(simulate_team_job, state.to_delta(), team, trials, seed)
+        if not isinstance(result, JSONResponse):
+            simulation_cache.put(key, result, model_version)
+    return result
+
+@app.get("/health")
+def health():
+    return {"status": "ok", "ready": registry.is_ready(), "artifacts": registry.status()}
 
 TEAM_NAME_TO_ABBR = {
     "Atlanta Hawks": "ATL",
@@ -76,6 +163,9 @@ class FAMove(BaseModel):
     player: str
     salary: float
     session_id: str
+    # Roster / fa_list versions the client already has: send roster_delta / fa_delta instead
+    since: Optional[int] = None
+    fa_since: Optional[int] = None
 
 class TradeMove(BaseModel):
     my_team: str
@@ -83,27 +173,61 @@ class TradeMove(BaseModel):
     players_out: List[str]
     players_in: List[str]
     session_id: str
+    since: Optional[int] = None
     
+class CandidateTrade(BaseModel):
+    trade_partner: str
+    players_out: List[str]
+    players_in: List[str]
+
+class FASigning(BaseModel):
+    type: Literal["sign_fa"] = "sign_fa"
+    player: str
+    salary: float
+
+class BatchTrade(CandidateTrade):
+    type: Literal["trade"] = "trade"
+
+class MoveBatch(BaseModel):
+    my_team: str
+    moves: List[Union[FASigning, BatchTrade]]
+    session_id: str
+    since: Optional[int] = None
+    fa_since: Optional[int] = None
+
+class TradeBatch(BaseModel):
+    my_team: str
+    trades: List[CandidateTrade]
+    session_id: str
+
+class TradeSearch(BaseModel):
+    my_team: str
+    assets: List[str]
+    session_id: str
+    top_k: int = 10
+
+class FASearch(BaseModel):
+    my_team: str
+    session_id: str
+    max_signings: int = 3
+    budget: Optional[float] = None
+    top_k: int = 10
+
 class SimulateRequest(BaseModel):
     team: str
     session_id: str
 
+class LeagueSimulateRequest(BaseModel):
+    session_id: str
+
 @app.post("/get_team_info")
 def get_team_info(req: TeamSelect):
     
     session_id = str(uuid.uuid4())
-    
-    session_state[session_id] = {
-        'team_roster': {},  
-        'fa_list': fa_list.copy()
-    }
-    
-    for abbr in TEAM_NAME_TO_ABBR.values():
-        session_state[session_id]['team_roster'][abbr] = TeamRoster(abbr, player_data, fa_list)
-    session_state[session_id]['fa_list'] = fa_list.copy()
+    state = LeagueState(registry.get("league_base"))
 
-    team_roster = session_state[session_id]['team_roster'][req.team]
-    session_fa_list = session_state[session_id]['fa_list']
+    team_roster = state.team(req.team)
+    session_store.put(session_id, state)
     
     roster = team_roster.roster.to_dict(orient="records")
     salary = team_roster.get_salary()
@@ -113,32 +237,43 @@ def get_team_info(req: TeamSelect):
         "team": req.team,
         "roster": roster,
         "salary": salary,
-        "fa_list": session_fa_list
+        "fa_list": state.fa_list,
+        "version": len(team_roster.moves),
+        "fa_version": state.fa_version
     }
 
 @app.post("/sign_fa")
 def sign_fa(move: FAMove):
     
-    state = session_state.get(move.session_id)
+    state = session_store.get(move.session_id)
     if state is None:
         return {"error": "Invalid session_id"}
     
-    team_roster = state['team_roster'][move.my_team]
-    session_fa_list = state['fa_list']
+    team_roster = state.team(move.my_team)
         
-    messages = process_fa_signing(team_roster, move.player, move.salary, player_data)
-    
-    if move.player in session_fa_list:
-        session_fa_list.remove(move.player)
+    messages = process_fa_signing(team_roster, move.player, move.salary, registry.get("league_table"))
+    state.remove_fa(move.player)
+    conflict = save_session(move.session_id, state)
+    if conflict is not None:
+        return conflict
     
     salary = team_roster.get_salary()
-    roster = team_roster.roster.to_dict(orient="records")
-    return {"status": "signed", "salary": salary, "roster": roster, "fa_list" : session_fa_list, "messages": messages}
+    response = {"status": "signed", "salary": salary, "messages": messages,
+                "version": len(team_roster.moves), "fa_version": state.fa_version}
+    if move.since is None:
+        response["roster"] = team_roster.roster.to_dict(orient="records")
+    else:
+        response["roster_delta"] = roster_delta(team_roster, move.since)
+    if move.fa_since is None:
+        response["fa_list"] = state.fa_list
+    else:
+        response["fa_delta"] = state.fa_delta(move.fa_since)
+    return response
 
 @app.post("/trade")
 def trade(move: TradeMove):
     
-    state = session_state.get(move.session_id)
+    state = session_store.get(move.session_id)
     if state is None:
         return {"error": "Invalid session_id"}
 
@@ -146,63 +281,165 @@ def trade(move: TradeMove):
     partner_abbr = move.trade_partner
     players_out = move.players_out
     players_in = move.players_in
-    
-    fa_list = state['fa_list']
 
-    team_roster = state['team_roster'][my_team_abbr]
-    if team_roster is None:
-        team_roster = TeamRoster(my_team_abbr, player_data, fa_list)
-        state['team_roster'][my_team_abbr] = team_roster
-        
-    partner_roster = state['team_roster'][partner_abbr]
-    if partner_roster is None:
-        partner_roster = TeamRoster(partner_abbr, player_data, fa_list)
-        state['team_roster'][partner_abbr] = partner_roster    
-
-    messages = process_trade(team_roster, players_out, players_in, partner_abbr, player_data)
-    process_trade(partner_roster, players_in, players_out, my_team_abbr, player_data)
-   
-    # Save rosters after trade
-    state['team_roster'][my_team_abbr] = team_roster
-    state['team_roster'][partner_abbr] = partner_roster
+    team_roster = state.team(my_team_abbr)
+    partner_roster = state.team(partner_abbr)
+
+    messages = process_trade(team_roster, players_out, players_in, partner_abbr, registry.get("league_table"), partner_roster=partner_roster)
+    conflict = save_session(move.session_id, state)
+    if conflict is not None:
+        return conflict
 
     salary = team_roster.get_salary()
-    roster = team_roster.roster.to_dict(orient="records")
-    return {"status": "trade_completed", "salary": salary, "roster": roster, "messages": messages}
+    response = {"status": "trade_completed", "salary": salary, "messages": messages, "version": len(team_roster.moves)}
+    if move.since is None:
+        response["roster"] = team_roster.roster.to_dict(orient="records")
+    else:
+        response["roster_delta"] = roster_delta(team_roster, move.since)
+    return response
 
 
-@app.get("/roster/{team}")
-def get_team_roster(team: str, session_id: str):
+@app.post("/moves/batch")
+async def apply_move_batch(
+    batch: MoveBatch,
+    simulate: bool = False,
+    trials: Optional[int] = Query(None, ge=1, le=MAX_SIMULATION_TRIALS),
+    seed: Optional[int] = Query(None, ge=0)
+):
+    """
+    Apply the moves in order, all or none: the session is saved only if every move passes
+    the cap rules (and, with simulate, the simulation of the result ran), then the roster
+    is serialized once.
+    """
+    state = session_store.get(batch.session_id)
+    if state is None:
+        return {"error": "Invalid session_id"}
+
+    moves = [move.model_dump() for move in batch.moves]
+    results, failed = apply_moves(state, batch.my_team, moves, registry.get("league_table"))
+    if failed is not None:
+        # state was rebuilt for this request; dropping it leaves the session untouched
+        return {"status": "rejected", "failed_move": failed, "results": results}
+
+    team_roster = state.team(batch.my_team)
+    response = {"status": "applied", "results": results, "salary": team_roster.get_salary(),
+                "version": len(team_roster.moves), "fa_version": state.fa_version}
+    if simulate:
+        simulation = await simulate_team(state, batch.my_team, trials, seed)
+        if isinstance(simulation, JSONResponse):
+            return simulation
+        response["simulation"] = simulation
+    # The simulation may have taken a while: a move saved meanwhile wins and this batch gets a 409
+    conflict = save_session(batch.session_id, state)
+    if conflict is not None:
+        return conflict
+
+    if batch.since is None:
+        response["roster"] = team_roster.roster.to_dict(orient="records")
+    else:
+        response["roster_delta"] = roster_delta(team_roster, batch.since)
+    if batch.fa_since is None:
+        response["fa_list"] = state.fa_list
+    else:
+        response["fa_delta"] = state.fa_delta(batch.fa_since)
+    return response
+
+
+@app.post("/trade/evaluate_batch")
+def evaluate_trade_batch(batch: TradeBatch):
     
-    state = session_state.get(session_id)
+    state = session_store.get(batch.session_id)
     if state is None:
         return {"error": "Invalid session_id"}
+
+    trades = [trade.model_dump() for trade in batch.trades]
+    return {"results": evaluate_trades(state.ledger, batch.my_team, trades)}
+
+
+@app.post("/trade/find")
+async def find_best_trades(search: TradeSearch, trials: int = Query(8, ge=1, le=64), seed: Optional[int] = Query(None, ge=0)):
     
-    team_roster = state['team_roster'][team]
-    fa_list = state['fa_list']
+    state = session_store.get(search.session_id)
+    if state is None:
+        return {"error": "Invalid session_id"}
+
+    return await run_simulation(
+        find_trades_job, state.to_delta(), search.my_team, search.assets, search.top_k, trials, seed
+    )
+
+
+@app.post("/fa/optimize")
+async def optimize_fa(search: FASearch, trials: int = Query(8, ge=1, le=64), seed: Optional[int] = Query(None, ge=0)):
     
-    if team_roster:
-        team_roster.roster = team_roster.roster[~team_roster.roster['PLAYER_NAME'].isin(fa_df['PLAYER_NAME'])]
-        return team_roster.roster.to_dict(orient='records')
-    else:
-        team_roster = TeamRoster(team, player_data, fa_list)
-        return team_roster.roster.to_dict(orient='records')
+    state = session_store.get(search.session_id)
+    if state is None:
+        return {"error": "Invalid session_id"}
+
+    return await run_simulation(
+        optimize_fa_job, state.to_delta(), search.my_team, search.max_signings, search.budget, search.top_k, trials, seed
+    )
+
+
+@app.get("/roster/{team}")
+def get_team_roster(team: str, session_id: str, since: Optional[int] = None):
+    
+    state = session_store.get(session_id)
+    if state is None:
+        return {"error": "Invalid session_id"}
+    
+    team_roster = state.team(team)
+    if since is not None:
+        # Versioned form: only the players moved since the client's version
+        return roster_delta(team_roster, since, exclude=registry.get("fa_list"))
+    roster = team_roster.roster[~team_roster.roster['PLAYER_NAME'].isin(registry.get("fa_list"))]
+    return roster.to_dict(orient='records')
 
 
 @app.post("/simulate")
-def simulate(request: SimulateRequest):
+async def simulate(
+    request: SimulateRequest,
+    trials: Optional[int] = Query(None, ge=1, le=MAX_SIMULATION_TRIALS),
+    seed: Optional[int] = Query(None, ge=0)
+):
     
-    state = session_state.get(request.session_id)
+    state = session_store.get(request.session_id)
     if state is None:
         return {"error": "Invalid session_id"}
     
-    team_roster = state['team_roster'][request.team]
-    if not team_roster:
-        team_roster = TeamRoster(request.team, player_data, fa_list)
+    result = await simulate_team(state, request.team, trials, seed)
+    # Results are plain JSON types: skip FastAPI's encoder walk over the per-player distributions
+    return result if isinstance(result, JSONResponse) else JSONResponse(result)
 
-    wins, players = simulate_next_season(team_roster)
-    return {
-        "wins": round(wins),
-        "losses": 82 - round(wins),
-        "top_players": players.to_dict(orient="records")
-    }
+
+@app.post("/simulate_league")
+async def simulate_whole_league(
+    request: LeagueSimulateRequest,
+    trials: Optional[int] = Query(None, ge=1, le=MAX_SIMULATION_TRIALS),
+    processes: Optional[int] = Query(None, ge=1, le=MAX_SIMULATION_PROCESSES),
+    seed: Optional[int] = Query(None, ge=0)
+):
+    
+    state = session_store.get(request.session_id)
+    if state is None:
+        return {"error": "Invalid session_id"}
+
+    # Each chunk of trials is its own pool job; the first error (429/503/504) is the response
+    delta = state.to_delta()
+    parts = await asyncio.gather(*[
+        run_simulation(simulate_league_job, delta, chunk_trials, chunk_seed)
+        for chunk_trials, chunk_seed in league_trial_chunks(trials, processes, seed)
+    ])
+    for part in parts:
+        if isinstance(part, JSONResponse):
+            return part
+    return league_standings(list(state.base.rosters), np.concatenate(parts, axis=1), trials)
+
+
+@app.get("/session_stats")
+def session_stats():
+    return session_store.stats()
+
+
+@app.get("/simulation_stats")
+def simulation_stats():
+    return {**simulation_pool.stats(), "cache": simulation_cache.stats()}
@@ -1,28 +1,79 @@
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
-import pandas as pd
-import os
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import Response
+from typing import List
+import hashlib
+import json
+from src import registry
 
 router = APIRouter()
 
-script_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.dirname(os.path.dirname(script_dir))
+# The catalog only changes with a deploy; clients revalidate with If-None-Match after this
+STATIC_CACHE_CONTROL = "public, max-age=3600"
 
-player_df = pd.read_csv(os.path.join(project_root,"data","player_stats_2024-25_with_salaries.csv"))
-for stat in ["PTS", "REB", "AST", "MIN"]:
-    player_df[stat] = round(player_df[stat] / player_df["GP"], 1)
-player_df["SALARY"] = round(player_df["SALARY"] / 1000000, 1)
-fa_df = pd.read_csv(os.path.join(project_root, "data", "fa_player.csv"))
+def _dumps(content):
+    # Same bytes JSONResponse would send
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def _etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def _payload(content):
+    body = _dumps(content)
+    return body, _etag(body)
+
+def static_response(request, body, etag):
+    """
+    A pre-serialized JSON body with a strong ETag and Cache-Control, or an empty 304 when
+    the request's If-None-Match already has that ETag.
+    """
+    headers = {"ETag": etag, "Cache-Control": STATIC_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+class StaticCatalog:
+    """
+    /teams, /fa_list and every /fa_player row serialized once, the rows indexed by
+    PLAYER_NAME (first row per name, as the old lookup took).
+    """
+    def __init__(self, player_df, fa_list):
+        self.teams = _payload(player_df['TEAM_ABBREVIATION'].unique().tolist())
+        self.fa_list = _payload(fa_list)
+
+        players = player_df.drop_duplicates('PLAYER_NAME')
+        records = players.to_dict(orient='records')
+        for record in records:
+            record['SALARY'] = round(record['SALARY'] / 1000000, 1)  # ensure salary units match frontend
+        self.players = {record['PLAYER_NAME']: _payload(record) for record in records}
+        self.missing_player = _payload({})
+
+    def player(self, player_name):
+        return self.players.get(player_name, self.missing_player)
+
+    def players_batch(self, player_names):
+        """
+        {name: row, ...} for the requested names ({} for unknown ones), joined from the
+        pre-serialized rows.
+        """
+        body = b"{" + b",".join(_dumps(name) + b":" + self.player(name)[0] for name in dict.fromkeys(player_names)) + b"}"
+        return body, _etag(body)
+
+@registry.register("static_catalog")
+def _load_static_catalog():
+    return StaticCatalog(registry.get("per_game_table"), registry.get("fa_list"))
 
 @router.get("/fa_list")
-async def get_fa_list():
-    fa_players = fa_df['PLAYER_NAME'].tolist()
-    return JSONResponse(content=fa_players)
+async def get_fa_list(request: Request):
+    catalog = registry.get("static_catalog")
+    return static_response(request, *catalog.fa_list)
 
 @router.get("/teams")
-async def get_teams():
-    teams = player_df['TEAM_ABBREVIATION'].unique().tolist()
-    return teams
+async def get_teams(request: Request):
+    catalog = registry.get("static_catalog")
+    return static_response(request, *catalog.teams)
 '''
 @router.get("/roster/{team}")
 async def get_team_roster(team: str):
@@ -34,11 +85,11 @@ async def get_team_roster(team: str):
         return team_roster.roster.to_dict(orient='records')
 '''
 
+@router.get("/fa_player")
+async def get_fa_players(request: Request, names: List[str] = Query(...)):
+    # Batch lookup: /fa_player?names=a&names=b
+    return static_response(request, *registry.get("static_catalog").players_batch(names))
+
 @router.get("/fa_player/{player_name}")
-async def get_fa_player(player_name: str):
-    player_row = player_df[player_df['PLAYER_NAME'] == player_name]
-    if player_row.empty:
-        return {}
-    player_dict = player_row.iloc[0].to_dict()
-    player_dict['SALARY'] = round(player_dict['SALARY'] / 1000000, 1)  # ensure salary units match frontend
-    return player_dict
+async def get_fa_player(request: Request, player_name: str):
+    return static_response(request, *registry.get("static_catalog").player(player_name))
@@ -0,0 +1,217 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from src import registry
+from src.league_state import LeagueState
+
+class SessionConflict(Exception):
+    pass
+
+class SessionStore:
+    """
+    Bounded store of session LeagueStates, kept as serialized move deltas.
+    Sessions idle for longer than ttl_seconds expire; beyond max_sessions or
+    max_bytes the least recently used sessions are evicted. Every save bumps a
+    session's revision, and put only saves a state loaded at the current one.
+    """
+    def __init__(self, ttl_seconds=3600, max_sessions=1000, max_bytes=64 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.counters = {'hits': 0, 'misses': 0, 'expired': 0, 'evicted_lru': 0, 'evicted_memory': 0, 'conflicts': 0}
+
+    def get(self, session_id):
+        entry = self._load(session_id, time.time())
+        if entry is None:
+            self.counters['misses'] += 1
+            return None
+        self.counters['hits'] += 1
+        data, revision = entry
+        state = LeagueState.from_delta(registry.get("league_base"), data)
+        state.revision = revision
+        return state
+
+    def put(self, session_id, state):
+        """
+        Save a session. A state from get is saved only if no other request saved the session
+        since (compare-and-swap on its revision); otherwise SessionConflict is raised.
+        """
+        revision = self._save(session_id, state.to_delta(), time.time(), state.revision)
+        if revision is None:
+            self.counters['conflicts'] += 1
+            raise SessionConflict(session_id)
+        state.revision = revision
+
+    def stats(self):
+        sessions, total_bytes = self._usage()
+        return {
+            'backend': type(self).__name__,
+            'sessions': sessions,
+            'bytes': total_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'max_sessions': self.max_sessions,
+            'max_bytes': self.max_bytes,
+            **self.counters,
+        }
+
+class InMemorySessionStore(SessionStore):
+    """
+    Single-process store backed by an OrderedDict in LRU order.
+    """
+    def __init__(self, **limits):
+        super().__init__(**limits)
+        self.sessions = OrderedDict()  # session_id -> (data, last_access, revision)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def _load(self, session_id, now):
+        with self.lock:
+            entry = self.sessions.get(session_id)
+            if entry is None:
+                return None
+            data, last_access, revision = entry
+            if now - last_access > self.ttl_seconds:
+                self._drop(session_id)
+                self.counters['expired'] += 1
+                return None
+            self.sessions[session_id] = (data, now, revision)
+            self.sessions.move_to_end(session_id)
+            return data, revision
+
+    def _save(self, session_id, data, now, expected):
+        # New revision, or None when the session was saved since revision `expected`
+        with self.lock:
+            revision = 0
+            if session_id in self.sessions:
+                current = self.sessions[session_id][2]
+                if expected is not None and current != expected:
+                    return None
+                revision = current + 1
+                self._drop(session_id)
+            elif expected is not None:
+                # Expired or evicted since it was read: saving brings it back
+                revision = expected + 1
+            self.sessions[session_id] = (data, now, revision)
+            self.total_bytes += len(data)
+            self._evict(now)
+            return revision
+
+    def _drop(self, session_id):
+        data, _, _ = self.sessions.pop(session_id)
+        self.total_bytes -= len(data)
+
+    def _evict(self, now):
+        # Oldest first: expire idle sessions, then enforce the count and memory caps
+        while self.sessions:
+            session_id, (data, last_access, _) = next(iter(self.sessions.items()))
+            if now - last_access > self.ttl_seconds:
+                self.counters['expired'] += 1
+            elif len(self.sessions) > self.max_sessions:
+                self.counters['evicted_lru'] += 1
+            elif self.total_bytes > self.max_bytes:
+                self.counters['evicted_memory'] += 1
+            else:
+                break
+            self._drop(session_id)
+
+    def _usage(self):
+        with self.lock:
+            return len(self.sessions), self.total_bytes
+
+class SQLiteSessionStore(SessionStore):
+    """
+    File-backed store that several uvicorn workers can share. Eviction counters are per worker.
+    """
+    def __init__(self, path, **limits):
+        super().__init__(**limits)
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, data BLOB NOT NULL, last_access REAL NOT NULL, "
+                "revision INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+            if "revision" not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _load(self, session_id, now):
+        with self._connect() as conn:
+            row = conn.execute("SELECT data, last_access, revision FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            data, last_access, revision = row
+            if now - last_access > self.ttl_seconds:
+                conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                self.counters['expired'] += 1
+                return None
+            conn.execute("UPDATE sessions SET last_access = ? WHERE id = ?", (now, session_id))
+            return data, revision
+
+    def _save(self, session_id, data, now, expected):
+        with self._connect() as conn:
+            # Write lock first, so the revision check and the write are atomic across workers
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT revision FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is not None and expected is not None and row[0] != expected:
+                return None
+            revision = row[0] + 1 if row is not None else (expected + 1 if expected is not None else 0)
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, last_access, revision) VALUES (?, ?, ?, ?)",
+                (session_id, data, now, revision)
+            )
+            self._evict(conn, now)
+            return revision
+
+    def _evict(self, conn, now):
+        cur = conn.execute("DELETE FROM sessions WHERE last_access < ?", (now - self.ttl_seconds,))
+        self.counters['expired'] += cur.rowcount
+        cur = conn.execute(
+            "DELETE FROM sessions WHERE id IN "
+            "(SELECT id FROM sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,)
+        )
+        self.counters['evicted_lru'] += cur.rowcount
+        cur = conn.execute(
+            "DELETE FROM sessions WHERE id IN (SELECT id FROM "
+            "(SELECT id, SUM(LENGTH(data)) OVER (ORDER BY last_access DESC, id) AS total FROM sessions) "
+            "WHERE total > ?)",
+            (self.max_bytes,)
+        )
+        self.counters['evicted_memory'] += cur.rowcount
+
+    def _usage(self):
+        with self._connect() as conn:
+            sessions, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sessions").fetchone()
+        return sessions, total_bytes
+
+def create_session_store():
+    """
+    Build the session store selected by SESSION_BACKEND (memory | sqlite).
+    """
+    limits = {
+        'ttl_seconds': float(os.environ.get("SESSION_TTL_SECONDS", 3600)),
+        'max_sessions': int(os.environ.get("SESSION_MAX_SESSIONS", 1000)),
+        'max_bytes': int(os.environ.get("SESSION_MAX_BYTES", 64 * 1024 * 1024)),
+    }
+    backend = os.environ.get("SESSION_BACKEND", "memory")
+    if backend == "sqlite":
+        path = os.environ.get("SESSION_DB_PATH", registry.project_path("sessions.sqlite3"))
+        return SQLiteSessionStore(path, **limits)
+    if backend == "memory":
+        return InMemorySessionStore(**limits)
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
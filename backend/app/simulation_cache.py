@@ -0,0 +1,74 @@
+import os
+import threading
+from collections import OrderedDict
+
+def _native(value):
+    return value.item() if hasattr(value, 'item') else value
+
+def canonical_order(roster):
+    """
+    Roster rows sorted by (PLAYER_ID, SALARY), so a seeded simulation depends only on who is
+    on the roster and at what salary, not on the order the moves were made in.
+    """
+    return roster.sort_values(['PLAYER_ID', 'SALARY'], kind='stable').reset_index(drop=True)
+
+def roster_fingerprint(roster):
+    return tuple(sorted(zip(map(_native, roster['PLAYER_ID']), map(_native, roster['SALARY']))))
+
+class SimulationCache:
+    """
+    Bounded LRU of seeded simulation results keyed by (roster fingerprint, seed, trials).
+    Every call passes the model version the result is for (SimulationPool.check_models): a new
+    version drops all entries, and a result computed under an older one is not stored.
+    """
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.model_version = None
+        self.lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'evicted_lru': 0, 'invalidations': 0}
+
+    def get(self, key, model_version):
+        if self.max_entries <= 0:
+            return None
+        with self.lock:
+            if model_version != self.model_version:
+                if self.entries:
+                    self.counters['invalidations'] += 1
+                self.entries.clear()
+                self.model_version = model_version
+            result = self.entries.get(key)
+            if result is None:
+                self.counters['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return result
+
+    def put(self, key, result, model_version):
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            if model_version != self.model_version:
+                return
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.counters['evicted_lru'] += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counters['hits'] + self.counters['misses']
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                **self.counters,
+                'hit_rate': round(self.counters['hits'] / lookups, 4) if lookups else None,
+            }
+
+def create_simulation_cache():
+    """
+    Cache sized from SIM_CACHE_ENTRIES (1024; 0 disables it).
+    """
+    return SimulationCache(max_entries=int(os.environ.get("SIM_CACHE_ENTRIES", 1024)))
@@ -0,0 +1,280 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from src import registry
+from src.league_state import LeagueState
+from src.simulate_team_with_offseason_moves import simulate_next_season, simulate_league_chunk
+from src.trade_finder import find_trades
+from src.fa_optimizer import optimize_free_agency
+from .simulation_cache import canonical_order
+
+# Artifacts every simulation needs, loaded once per worker process
+WORKER_ARTIFACTS = ["league_base", "player_history", "aging_models", "win_model"]
+
+class PoolFull(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Simulation queue is full")
+        self.retry_after = retry_after
+
+class PoolTimeout(Exception):
+    pass
+
+class PoolUnavailable(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Simulation workers are restarting")
+        self.retry_after = retry_after
+
+# Jobs: module-level so they pickle by name. Each gets the session as its move delta
+# (LeagueState.to_delta) and rebuilds it on the worker's own copy of the league base.
+
+def _state(delta):
+    return LeagueState.from_delta(registry.get("league_base"), delta)
+
+def simulate_team_job(delta, team, trials, seed):
+    team_roster = _state(delta).team(team)
+    # Same seed and roster -> same result; no seed draws a fresh stream per request
+    rng = np.random.default_rng(seed)
+    if seed is not None:
+        # Canonical row order: the result depends on the roster, not the order of the moves that built it
+        team_roster.roster = canonical_order(team_roster.roster)
+
+    if trials is not None:
+        # Monte Carlo mode: win percentiles and per-player stat distributions over N trials
+        summary = simulate_next_season(team_roster, n_trials=trials, rng=rng)
+        wins = summary["wins_mean"]
+        return {
+            "wins": round(wins),
+            "losses": 82 - round(wins),
+            **summary
+        }
+
+    wins, players = simulate_next_season(team_roster, rng=rng)
+    return {
+        "wins": round(wins),
+        "losses": 82 - round(wins),
+        "top_players": players.to_dict(orient="records")
+    }
+
+def simulate_league_job(delta, trials, seed):
+    # One chunk of a league simulation (league_trial_chunks): the API submits each chunk as its
+    # own job, so they run in parallel within the pool's process limit and queue
+    return simulate_league_chunk(_state(delta).all_teams(), trials, seed)
+
+def find_trades_job(delta, team, assets, top_k, trials, seed):
+    return find_trades(_state(delta), team, assets, top_k=top_k, n_trials=trials, rng=np.random.default_rng(seed))
+
+def optimize_fa_job(delta, team, max_signings, budget, top_k, trials, seed):
+    return optimize_free_agency(
+        _state(delta), team, max_signings=max_signings, budget=budget,
+        top_k=top_k, n_trials=trials, rng=np.random.default_rng(seed)
+    )
+
+def _run_timed(job, args):
+    # Runs in the worker: the job's result with its wall-clock start and end
+    started = time.time()
+    result = job(*args)
+    return result, started, time.time()
+
+def _warm_worker():
+    registry.warmup(WORKER_ARTIFACTS)
+
+class SimulationPool:
+    """
+    Runs simulation jobs in a dedicated process pool so their CPU work never holds the API
+    process's GIL. At most processes + max_queue jobs are accepted at once; beyond that
+    submit raises PoolFull with a Retry-After estimate. Callers stop waiting after
+    timeout_seconds (the job still finishes and holds its slot until then). processes=0 runs
+    jobs in the API's threadpool instead, with the same limits and metrics. When a model file
+    changes, later jobs run on the new models (see check_models).
+    """
+    def __init__(self, processes=None, max_queue=None, timeout_seconds=30, history=1000, check_seconds=1.0):
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.max_queue = max_queue if max_queue is not None else 2 * max(self.processes, 1)
+        self.timeout_seconds = timeout_seconds
+        self.slots = threading.BoundedSemaphore(max(self.processes, 1) + self.max_queue)
+        self.executor = None
+        self.lock = threading.Lock()
+        self.check_seconds = check_seconds
+        self.model_version = registry.model_version()
+        self.models_checked_at = time.monotonic()
+        self.in_flight = 0
+        self.counters = {'accepted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'timeouts': 0, 'restarts': 0, 'model_reloads': 0}
+        self.wait_seconds = deque(maxlen=history)
+        self.run_seconds = deque(maxlen=history)
+
+    def start(self, prewarm=False):
+        """
+        Create the worker pool (on first use otherwise). Workers come from a forkserver, not
+        a fork of the API process and its threads; prewarm spawns them all now so the first
+        requests don't pay for loading the models.
+        """
+        # Under the lock: the warmup thread and the first request must not both create a pool
+        with self.lock:
+            if self.processes <= 0 or self.executor is not None:
+                return
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            executor = self.executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=context, initializer=_warm_worker)
+        if prewarm:
+            for future in [executor.submit(_warm_worker) for _ in range(self.processes)]:
+                future.result()
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _restart(self, broken):
+        # Replace a broken pool once, however many requests noticed it
+        with self.lock:
+            if self.executor is broken:
+                self.executor = None
+                self.counters['restarts'] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    def check_models(self):
+        """
+        Version of the models jobs submitted now run on (registry.model_version, read at most
+        every check_seconds). When it changed the workers are recycled, or with processes=0
+        the API's own models unloaded, so later jobs load the new files; jobs already
+        submitted finish on the old models.
+        """
+        now = time.monotonic()
+        with self.lock:
+            if now - self.models_checked_at < self.check_seconds:
+                return self.model_version
+            self.models_checked_at = now
+        model_version = registry.model_version()
+        with self.lock:
+            if model_version == self.model_version:
+                return model_version
+            self.model_version = model_version
+            executor, self.executor = self.executor, None
+            self.counters['model_reloads'] += 1
+        if self.processes <= 0:
+            registry.unload(registry.MODEL_ARTIFACTS)
+        elif executor is not None:
+            # No cancel_futures: queued jobs still run on the old workers
+            executor.shutdown(wait=False)
+        return model_version
+
+    def queue_depth(self):
+        return max(0, self.in_flight - max(self.processes, 1))
+
+    def retry_after(self):
+        """
+        Seconds until a slot is likely free: the queue ahead drained at the recent mean run time.
+        """
+        mean_run = sum(self.run_seconds) / len(self.run_seconds) if self.run_seconds else 1.0
+        return max(1, math.ceil(mean_run * (self.queue_depth() + 1) / max(self.processes, 1)))
+
+    def _release(self, submitted, outcome):
+        with self.lock:
+            self.in_flight -= 1
+            if outcome is None:
+                self.counters['failed'] += 1
+            else:
+                _, started, finished = outcome
+                self.counters['completed'] += 1
+                self.wait_seconds.append(max(0.0, started - submitted))
+                self.run_seconds.append(finished - started)
+        self.slots.release()
+
+    def _submit(self, job, args):
+        # (future, the executor running it)
+        self.check_models()
+        if self.processes == 0:
+            return asyncio.ensure_future(run_in_threadpool(_run_timed, job, args)), None
+        self.start()
+        executor = self.executor
+        try:
+            return asyncio.wrap_future(executor.submit(_run_timed, job, args)), executor
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory): replace the pool and retry once
+            self._restart(executor)
+            executor = self.executor
+            return asyncio.wrap_future(executor.submit(_run_timed, job, args)), executor
+
+    async def run(self, job, *args):
+        """
+        Run job(*args) in the pool and return its result. Raises PoolFull when the queue is
+        full, PoolTimeout after timeout_seconds and PoolUnavailable when the pool broke under
+        the job (it is replaced before the next one).
+        """
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.counters['rejected'] += 1
+            raise PoolFull(self.retry_after())
+
+        submitted = time.time()
+        with self.lock:
+            self.in_flight += 1
+            self.counters['accepted'] += 1
+        try:
+            future, executor = self._submit(job, args)
+        except Exception:
+            self._release(submitted, None)
+            raise
+
+        def done(f):
+            self._release(submitted, None if f.cancelled() or f.exception() is not None else f.result())
+        future.add_done_callback(done)
+
+        try:
+            # shield: a timed-out job keeps its slot until it actually finishes
+            result, _, _ = await asyncio.wait_for(asyncio.shield(future), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            with self.lock:
+                self.counters['timeouts'] += 1
+            raise PoolTimeout(f"Simulation took longer than {self.timeout_seconds}s")
+        except BrokenProcessPool:
+            if executor is not None:
+                self._restart(executor)
+            raise PoolUnavailable(self.retry_after())
+        return result
+
+    def stats(self):
+        def summary(values):
+            if not values:
+                return {'mean': None, 'p95': None, 'max': None}
+            values = sorted(values)
+            return {
+                'mean': round(sum(values) / len(values), 4),
+                'p95': round(values[min(len(values) - 1, int(0.95 * len(values)))], 4),
+                'max': round(values[-1], 4),
+            }
+        with self.lock:
+            return {
+                'processes': self.processes,
+                'max_queue': self.max_queue,
+                'timeout_seconds': self.timeout_seconds,
+                'in_flight': self.in_flight,
+                'queue_depth': self.queue_depth(),
+                **self.counters,
+                'wait_seconds': summary(self.wait_seconds),
+                'run_seconds': summary(self.run_seconds),
+            }
+
+def create_simulation_pool():
+    """
+    Pool configured from the environment:
+    SIM_PROCESSES (CPU count; 0 runs jobs in the API threadpool), SIM_MAX_QUEUE
+    (2 x processes) and SIM_TIMEOUT_SECONDS (30).
+    """
+    processes = os.environ.get("SIM_PROCESSES")
+    max_queue = os.environ.get("SIM_MAX_QUEUE")
+    return SimulationPool(
+        processes=int(processes) if processes is not None else None,
+        max_queue=int(max_queue) if max_queue is not None else None,
+        timeout_seconds=float(os.environ.get("SIM_TIMEOUT_SECONDS", 30)),
+    )
@@ -1,4 +1,5 @@
 import pandas as pd
+from .registry import project_path
 
 def merge_salaries(input_path, salaries_path, output_path):
     
@@ -16,7 +17,7 @@ def merge_salaries(input_path, salaries_path, output_path):
 
 if __name__ == "__main__":
     merge_salaries(
-        input_path="data/player_stats_2024-25_cleaned.csv",
-        salaries_path="data/player_salaries.csv",
-        output_path="data/player_stats_2024-25_with_salaries.csv"
+        input_path=project_path("data", "player_stats_2024-25_cleaned.csv"),
+        salaries_path=project_path("data", "player_salaries.csv"),
+        output_path=project_path("data", "player_stats_2024-25_with_salaries.csv")
     )
\ No newline at end of file
@@ -1,65 +1,132 @@
+import sys
+import time
+import numpy as np
 import pandas as pd
+from .column_cache import read_table
+from .registry import SEASONS, project_path
 
-def build_player_aging_dataset():
-    
-    seasons = ["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"]
-    player_data = []
+PER_MIN_STATS = ["PTS", "REB", "OREB", "AST", "STL", "BLK", "TOV"]
+PER_GAME_STATS = ["FG3M"]
 
-    for season in seasons:
-        df = pd.read_csv(f"data/player_stats_{season}_cleaned.csv")
-        df["SEASON"] = season
-        player_data.append(df)
+# Filter out players who didn’t play much either season
+MIN_MINUTES = 200
 
-    all_players = pd.concat(player_data, ignore_index=True)
-    all_players = all_players.sort_values(by=["PLAYER_ID", "SEASON"])
+def aging_pairs(all_players):
+    """
+    One record per player and pair of consecutive seasons they appear in, both with at least
+    MIN_MINUTES, ordered by PLAYER_ID then season. all_players has one row per player and
+    season, with a SEASON column. Rows are paired with the next row of the same player after
+    sorting (a shift within PLAYER_ID), so a season the player missed is skipped over.
+    """
+    players = all_players.sort_values(by=["PLAYER_ID", "SEASON"], kind="stable")
+    player_id = players["PLAYER_ID"].to_numpy()
+    minutes = players["MIN"].to_numpy()
 
-    records = []
+    # Positions of the "last" rows; the "next" row is the one after it
+    last = np.flatnonzero(
+        (player_id[:-1] == player_id[1:]) & ~(minutes[:-1] < MIN_MINUTES) & ~(minutes[1:] < MIN_MINUTES)
+    )
+    nxt = last + 1
+    season = players["SEASON"].to_numpy()
 
+    record = {
+        "PLAYER_ID": player_id[last],
+        "AGE_last": players["AGE"].to_numpy()[last],
+        "SEASON_last": season[last],
+        "SEASON_next": season[nxt],
+    }
+
+    # Compute per-minute stats for both years
+    minutes = minutes.astype(float)
+    safe_minutes = np.where(minutes > 0, minutes, 1)
+    for stat in PER_MIN_STATS:
+        per_min = np.where(minutes > 0, players[stat].to_numpy(dtype=float) / safe_minutes, 0)
+        record[f"{stat}_per_min_last"] = np.round(per_min[last], 3)
+        record[f"{stat}_per_min_next"] = np.round(per_min[nxt], 3)
+
+    games = players["GP"].to_numpy(dtype=float)
+    for stat in PER_GAME_STATS:
+        per_game = players[stat].to_numpy(dtype=float) / games
+        record[f"{stat}_last"] = np.round(per_game[last], 1)
+        record[f"{stat}_next"] = np.round(per_game[nxt], 1)
+
+    return pd.DataFrame(record)
+
+def _aging_pairs_reference(all_players):
+    # The original per-player loop, kept to verify aging_pairs against. Row values are
+    # numpy scalars, so round() here is np.round
+    all_players = all_players.sort_values(by=["PLAYER_ID", "SEASON"])
+    records = []
     for player_id, group in all_players.groupby("PLAYER_ID"):
         group = group.sort_values("SEASON")
         seasons_list = group["SEASON"].tolist()
-        
-        if len(seasons_list) < 2:
-            continue
-        
-        for i in range(len(seasons_list) -1):
-            season_t = seasons_list[i]
-            season_t1 = seasons_list[i+1]
-            
-            stats_t = group[group["SEASON"] == season_t].iloc[0]
-            stats_t1 = group[group["SEASON"] == season_t1].iloc[0]
-            
-            stats_t = group[group["SEASON"] == season_t].iloc[0]
-            stats_t1 = group[group["SEASON"] == season_t1].iloc[0]
-
-            # Filter out players who didn’t play much either season
-            if stats_t["MIN"] < 200 or stats_t1["MIN"] < 200:
+        for i in range(len(seasons_list) - 1):
+            stats_t = group[group["SEASON"] == seasons_list[i]].iloc[0]
+            stats_t1 = group[group["SEASON"] == seasons_list[i + 1]].iloc[0]
+            if stats_t["MIN"] < MIN_MINUTES or stats_t1["MIN"] < MIN_MINUTES:
                 continue
-            
-            record = {
-                "PLAYER_ID": player_id,
-                "AGE_last": stats_t["AGE"],
-                "SEASON_last": season_t,
-                "SEASON_next": season_t1
-            }
-            
-            # Compute per-minute stats for both years
-            for stat in ["PTS", "REB", "OREB", "AST", "STL", "BLK", "TOV"]:
-                per_min_last = stats_t[stat] / stats_t["MIN"] if stats_t["MIN"] > 0 else 0
-                per_min_next = stats_t1[stat] / stats_t1["MIN"] if stats_t1["MIN"] > 0 else 0
-
-                record[f"{stat}_per_min_last"] = round(per_min_last, 3)
-                record[f"{stat}_per_min_next"] = round(per_min_next, 3)
-
-            for stat in ["FG3M"]:
+            record = {"PLAYER_ID": player_id, "AGE_last": stats_t["AGE"], "SEASON_last": seasons_list[i], "SEASON_next": seasons_list[i + 1]}
+            for stat in PER_MIN_STATS:
+                record[f"{stat}_per_min_last"] = round(stats_t[stat] / stats_t["MIN"] if stats_t["MIN"] > 0 else 0, 3)
+                record[f"{stat}_per_min_next"] = round(stats_t1[stat] / stats_t1["MIN"] if stats_t1["MIN"] > 0 else 0, 3)
+            for stat in PER_GAME_STATS:
                 record[f"{stat}_last"] = round(stats_t[stat] / stats_t["GP"], 1)
                 record[f"{stat}_next"] = round(stats_t1[stat] / stats_t1["GP"], 1)
-
             records.append(record)
+    return pd.DataFrame(records)
+
+def load_seasons(seasons):
+    player_data = []
+    for season in seasons:
+        df = read_table(project_path("data", f"player_stats_{season}_cleaned.csv"))
+        df["SEASON"] = season
+        player_data.append(df)
+    return pd.concat(player_data, ignore_index=True)
 
-    history_df = pd.DataFrame(records)
-    history_df.to_csv("data/player_aging_dataset.csv", index=False)
+def build_player_aging_dataset(seasons=SEASONS):
+    history_df = aging_pairs(load_seasons(seasons))
+    history_df.to_csv(project_path("data", "player_aging_dataset.csv"), index=False)
     print("Saved player aging dataset with per-minute stats")
 
+def synthetic_seasons(all_players, n_seasons):
+    """
+    n_seasons of league history made by relabelling the real seasons in a cycle (ages shifted
+    by each full cycle), so players carry over between consecutive synthetic seasons.
+    """
+    real = [df for _, df in all_players.groupby("SEASON", sort=True)]
+    frames = []
+    for k in range(n_seasons):
+        df = real[k % len(real)].copy()
+        df["AGE"] += (k // len(real)) * len(real)
+        df["SEASON"] = f"{1975 + k}-{(1976 + k) % 100:02d}"
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+def benchmark_aging_dataset(season_counts=(5, 20, 50), seasons=SEASONS):
+    """
+    Check aging_pairs against the per-player loop on the real seasons (as written to CSV) and
+    time both on synthetic histories of each length.
+    """
+    real = load_seasons(seasons)
+    expected = _aging_pairs_reference(real).to_csv(index=False)
+    assert aging_pairs(real).to_csv(index=False) == expected, "vectorized aging dataset differs from the loop"
+    print(f"Real seasons: identical output ({expected.count(chr(10)) - 1} pairs)")
+
+    for n_seasons in season_counts:
+        all_players = synthetic_seasons(real, n_seasons)
+        timings, outputs = {}, {}
+        for label, build in [("loop", _aging_pairs_reference), ("vectorized", aging_pairs)]:
+            start = time.perf_counter()
+            result = build(all_players)
+            timings[label] = time.perf_counter() - start
+            outputs[label] = result.to_csv(index=False)
+        assert outputs["loop"] == outputs["vectorized"], f"outputs differ at {n_seasons} seasons"
+        print(f"{n_seasons:3d} seasons ({len(all_players)} rows, {len(result)} pairs): "
+              f"loop {timings['loop']:7.2f}s, vectorized {timings['vectorized'] * 1000:7.1f} ms "
+              f"({timings['loop'] / timings['vectorized']:.0f}x)")
+
 if __name__ == "__main__":
-    build_player_aging_dataset()
\ No newline at end of file
+    if "--benchmark" in sys.argv:
+        benchmark_aging_dataset()
+    else:
+        build_player_aging_dataset()
@@ -1,16 +1,16 @@
 import pandas as pd
-
-SEASONS = ["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"]
+from .column_cache import read_table
+from .registry import SEASONS, project_path
 
 # Define which columns to sum vs. mean
 SUM_COLS = ['PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'MIN', 'GP', 'FG3M', 'PLUS_MINUS']
 MEAN_COLS = ['FG_PCT', 'FG3_PCT', 'FT_PCT', 'AGE']
 
 def build_team_features(season):
-    input_path = f"data/player_stats_{season}_cleaned.csv"
-    output_path = f"data/team_features_{season}.csv"
+    input_path = project_path("data", f"player_stats_{season}_cleaned.csv")
+    output_path = project_path("data", f"team_features_{season}.csv")
 
-    df = pd.read_csv(input_path)
+    df = read_table(input_path)
 
     grouped_sum = df.groupby("TEAM_ABBREVIATION")[SUM_COLS].sum()
     grouped_mean = df.groupby("TEAM_ABBREVIATION")[MEAN_COLS].mean().round(2)
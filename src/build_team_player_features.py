@@ -0,0 +1,195 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from .column_cache import read_table
+from .feature_encoder import PLAYER_FEATURES, TOP_N_PLAYERS, encode_top_players, feature_columns
+from .registry import SEASONS, project_path
+
+PER_GAME_STATS = ['PTS', 'REB', 'OREB', 'AST', 'STL', 'BLK', 'TOV']
+# Per-game stats rounded before the GP filter, with Series.round semantics (np.round)
+SEASON_PER_GAME_STATS = ["FG3M", "MIN", "PLUS_MINUS"]
+MIN_GAMES = 20
+
+TEAM_NAME_TO_ABBR = {
+    "Atlanta Hawks": "ATL",
+    "Boston Celtics": "BOS",
+    "Brooklyn Nets": "BKN",
+    "Charlotte Hornets": "CHA",
+    "Chicago Bulls": "CHI",
+    "Cleveland Cavaliers": "CLE",
+    "Dallas Mavericks": "DAL",
+    "Denver Nuggets": "DEN",
+    "Detroit Pistons": "DET",
+    "Golden State Warriors": "GSW",
+    "Houston Rockets": "HOU",
+    "Indiana Pacers": "IND",
+    "LA Clippers": "LAC",
+    "Los Angeles Lakers": "LAL",
+    "Memphis Grizzlies": "MEM",
+    "Miami Heat": "MIA",
+    "Milwaukee Bucks": "MIL",
+    "Minnesota Timberwolves": "MIN",
+    "New Orleans Pelicans": "NOP",
+    "New York Knicks": "NYK",
+    "Oklahoma City Thunder": "OKC",
+    "Orlando Magic": "ORL",
+    "Philadelphia 76ers": "PHI",
+    "Phoenix Suns": "PHX",
+    "Portland Trail Blazers": "POR",
+    "Sacramento Kings": "SAC",
+    "San Antonio Spurs": "SAS",
+    "Toronto Raptors": "TOR",
+    "Utah Jazz": "UTA",
+    "Washington Wizards": "WAS"
+}
+
+def build_team_row(team_df, team_abbr, season, kind="stable"):
+    
+    team_players = team_df[team_df["TEAM_ABBREVIATION"] == team_abbr]
+
+    # Filter players who played 20+ games 
+    team_players = team_players[team_players["GP"] >= 20]
+
+    # Compute per-game stats for selected stats (Python's round, which rounds the exact double: 10.05 -> 10.1)
+    for stat in PER_GAME_STATS:
+        team_players[stat] = [round(value, 1) for value in (team_players[stat] / team_players["GP"]).tolist()]
+
+    # Sort by points per game descending, ties in file order (the default quicksort's tie order
+    # depends on numpy's SIMD sort); the encoder's stable sort keeps this order
+    team_players = team_players.sort_values("PTS", ascending=False, kind=kind)
+    stats = {feat: team_players[feat].to_numpy(dtype=float)[None, :] for feat in PLAYER_FEATURES}
+
+    # Top players, zero-padded; training minutes are not normalized
+    _, X = encode_top_players(stats, features=PLAYER_FEATURES, normalize_minutes=False)
+
+    row = {'TEAM_ABBREVIATION': team_abbr, 'SEASON': season}
+    row.update(zip(feature_columns(PLAYER_FEATURES), X[0].ravel().tolist()))
+    return row
+
+def round_exact(values, digits):
+    """
+    Python's round on every element of a float array (it rounds the exact double: 10.05 ->
+    10.1, where np.round gives 10.0). The two only disagree next to a .5 boundary, so only
+    those elements go through round().
+    """
+    rounded = np.round(values, digits)
+    scaled = values * 10 ** digits
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    rounded[near_half] = [round(value, digits) for value in values[near_half].tolist()]
+    return rounded
+
+def team_features(players):
+    """
+    build_team_row for every (SEASON, TEAM_ABBREVIATION) of players at once: one sort of all
+    eligible players by team then per-game PTS (descending, ties in file order), a rank within
+    each team, and a scatter of the top TOP_N_PLAYERS ranks into zero-padded slots. players
+    holds every season's rows with a SEASON column and SEASON_PER_GAME_STATS already per game.
+    Rows come out by season, then team in order of first appearance.
+    """
+    players = players.reset_index(drop=True)
+    group, keys = pd.factorize(pd.MultiIndex.from_arrays([players["SEASON"], players["TEAM_ABBREVIATION"]]))
+
+    # Filter players who played 20+ games
+    rows = np.flatnonzero(players["GP"].to_numpy(dtype=float) >= MIN_GAMES)
+    values = {feat: players[feat].to_numpy(dtype=float)[rows] for feat in PLAYER_FEATURES}
+    for stat in PER_GAME_STATS:
+        values[stat] = round_exact((players[stat] / players["GP"]).to_numpy(dtype=float)[rows], 1)
+
+    # Rank within each team by points per game
+    order = np.lexsort((-values["PTS"], group[rows]))
+    team = group[rows][order]
+    rank = np.arange(len(order)) - np.searchsorted(team, team, side="left")
+    top = rank < TOP_N_PLAYERS
+
+    X = np.zeros((len(keys), TOP_N_PLAYERS, len(PLAYER_FEATURES)))
+    X[team[top], rank[top]] = np.stack([values[feat][order[top]] for feat in PLAYER_FEATURES], axis=1)
+
+    df = pd.DataFrame(X.reshape(len(keys), -1), columns=feature_columns(PLAYER_FEATURES))
+    df.insert(0, "TEAM_ABBREVIATION", keys.get_level_values(1))
+    df.insert(1, "SEASON", keys.get_level_values(0))
+    return df
+
+def load_players(seasons):
+    player_data = []
+    for season in seasons:
+        players = read_table(project_path("data", f"player_stats_{season}_cleaned.csv"))
+        for stat in SEASON_PER_GAME_STATS:
+            players[stat] = round(players[stat] / players["GP"], 1)
+        players["SEASON"] = season
+        player_data.append(players)
+    return pd.concat(player_data, ignore_index=True)
+
+def team_wins(seasons):
+    """
+    W per (SEASON, TEAM_ABBREVIATION) from the team estimates, first match per team.
+    """
+    wins = []
+    for season in seasons:
+        teams = read_table(project_path("data", f"team_estimates_{season}_cleaned.csv"))
+        wins.append(pd.DataFrame({
+            "SEASON": season, "TEAM_ABBREVIATION": teams["TEAM_NAME"].map(TEAM_NAME_TO_ABBR), "W": teams["W"],
+        }).dropna(subset=["TEAM_ABBREVIATION"]).drop_duplicates(["SEASON", "TEAM_ABBREVIATION"]))
+    return pd.concat(wins, ignore_index=True)
+
+def build_full_dataset(seasons=SEASONS):
+    df = team_features(load_players(seasons))
+
+    # Teams without a win total are dropped
+    df = df.merge(team_wins(seasons), on=["SEASON", "TEAM_ABBREVIATION"], how="inner", sort=False)
+    df.to_csv(project_path("data", "team_player_features.csv"), index=False)
+    print("Saved team_player_features.csv with player-level representation")
+    return df
+
+def _team_rows_reference(players, kind="stable"):
+    # build_team_row per team, in the order the per-season loop visited them
+    return pd.DataFrame([
+        build_team_row(season_players, team_abbr, season, kind)
+        for season, season_players in players.groupby("SEASON", sort=False)
+        for team_abbr in season_players["TEAM_ABBREVIATION"].unique()
+    ])
+
+def _tie_reordered_rows(a, b):
+    """
+    Positions of the rows where a and b differ, asserting that each difference is only in
+    which of the players with equal PTS fills which slot (the PTS columns are identical).
+    """
+    X = a[feature_columns(PLAYER_FEATURES)].to_numpy()
+    Y = b[feature_columns(PLAYER_FEATURES)].to_numpy()
+    pts = feature_columns(["PTS"])
+    assert np.array_equal(a[pts].to_numpy(), b[pts].to_numpy()), "team rows differ beyond tie order"
+    return np.flatnonzero((X != Y).any(axis=1))
+
+def benchmark_team_features(season_counts=(5, 50, 500), reference_max_seasons=50, seasons=SEASONS):
+    """
+    Check team_features against build_team_row on the real seasons, then time both on
+    synthetic leagues (the per-team loop only up to reference_max_seasons).
+    """
+    from .build_player_aging_dataset import synthetic_seasons
+
+    real = load_players(seasons)
+    expected = _team_rows_reference(real)
+    assert team_features(real).to_csv(index=False) == expected.to_csv(index=False), "team features differ from build_team_row"
+    legacy = _team_rows_reference(real, kind="quicksort")
+    reordered = _tie_reordered_rows(expected, legacy)
+    print(f"Real seasons: identical features ({len(expected)} team rows; "
+          f"{len(reordered)} differ from the unstable quicksort only in the order of tied players)")
+
+    for n_seasons in season_counts:
+        players = synthetic_seasons(real, n_seasons)
+        start = time.perf_counter()
+        df = team_features(players)
+        vectorized = time.perf_counter() - start
+        line = f"{n_seasons:4d} seasons ({len(players)} players, {len(df)} team rows): vectorized {vectorized:6.2f}s"
+        if n_seasons <= reference_max_seasons:
+            start = time.perf_counter()
+            expected = _team_rows_reference(players)
+            line += f", per-team loop {time.perf_counter() - start:6.2f}s"
+            assert df.to_csv(index=False) == expected.to_csv(index=False), f"features differ at {n_seasons} seasons"
+        print(line)
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_team_features()
+    else:
+        build_full_dataset()
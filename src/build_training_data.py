@@ -1,4 +1,6 @@
 import pandas as pd
+from .column_cache import read_table
+from .registry import SEASONS, project_path
 
 TEAM_NAME_TO_ABBR = {
     "Atlanta Hawks": "ATL",
@@ -33,11 +35,9 @@ TEAM_NAME_TO_ABBR = {
     "Washington Wizards": "WAS"
 }
 
-SEASONS = ["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"]
-
 def merge_features_and_labels(season):
-    features = pd.read_csv(f"data/team_features_{season}.csv")
-    estimates = pd.read_csv(f"data/team_estimates_{season}_cleaned.csv")
+    features = read_table(project_path("data", f"team_features_{season}.csv"))
+    estimates = read_table(project_path("data", f"team_estimates_{season}_cleaned.csv"))
     estimates["TEAM_ABBREVIATION"] = estimates["TEAM_NAME"].map(TEAM_NAME_TO_ABBR)
 
     merged = pd.merge(
@@ -50,11 +50,12 @@ def merge_features_and_labels(season):
     merged["SEASON"] = season
     return merged
 
-def build_training_data():
-    all_seasons = [merge_features_and_labels(season) for season in SEASONS]
+def build_training_data(seasons=SEASONS):
+    all_seasons = [merge_features_and_labels(season) for season in seasons]
     df = pd.concat(all_seasons, ignore_index=True)
-    df.to_csv("data/team_training_data.csv", index=False)
-    print("Saved full training dataset to data/team_training_data.csv")
+    output_path = project_path("data", "team_training_data.csv")
+    df.to_csv(output_path, index=False)
+    print(f"Saved full training dataset to {output_path}")
     return df
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 import pandas as pd
 import unicodedata
+from .registry import SEASONS, project_path
 
 def clean_player_stats(input_path, output_path):
     keep_stats = [
@@ -21,8 +22,8 @@ def normalize_name(name):
     return unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode('utf-8').strip().lower()
 
 if __name__ == "__main__":
-    for season in ["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"]:
+    for season in SEASONS:
         clean_player_stats(
-            input_path=f"data/player_stats_{season}.csv",
-            output_path=f"data/player_stats_{season}_cleaned.csv"
+            input_path=project_path("data", f"player_stats_{season}.csv"),
+            output_path=project_path("data", f"player_stats_{season}_cleaned.csv")
         )
\ No newline at end of file
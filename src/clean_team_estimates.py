@@ -1,7 +1,6 @@
 import pandas as pd
 import os
-
-SEASONS = ["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"]
+from .registry import SEASONS, project_path
 
 KEEP_COLS = [
     "TEAM_NAME", "GP", "W", "L", "W_PCT",
@@ -10,10 +9,10 @@ KEEP_COLS = [
 ]
 
 def clean_team_estimates(season):
-    path = f"data/team_estimates_{season}.csv"
+    path = project_path("data", f"team_estimates_{season}.csv")
     df = pd.read_csv(path)
     df_cleaned = df[KEEP_COLS]
-    df_cleaned.to_csv(f"data/team_estimates_{season}_cleaned.csv", index=False)
+    df_cleaned.to_csv(project_path("data", f"team_estimates_{season}_cleaned.csv"), index=False)
     print(f"Cleaned {season} saved.")
 
 def clean_all_team_estimates():
@@ -0,0 +1,220 @@
+import glob
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from .registry import file_sha256
+
+try:
+    import fcntl
+except ImportError:  # Windows: rebuilds are not serialized across processes
+    fcntl = None
+
+CACHE_VERSION = 2
+CACHE_DIR_NAME = ".cache"
+
+# String columns with at most this many distinct values per row (e.g. TEAM_ABBREVIATION)
+# are served as categoricals; the rest (e.g. PLAYER_NAME) keep their CSV dtype
+MAX_CATEGORY_RATIO = 0.5
+
+def cache_dir(csv_path):
+    """
+    data/foo.csv -> data/.cache/foo.csv/, holding meta.json and the column blocks.
+    """
+    head, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(head, CACHE_DIR_NAME, name)
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return stat.st_mtime_ns, stat.st_size
+
+def _load_meta(directory):
+    try:
+        with open(os.path.join(directory, "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_meta(directory, meta):
+    tmp_path = os.path.join(directory, f"meta.json.{os.getpid()}")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(directory, "meta.json"))
+
+def is_fresh(csv_path, meta):
+    """
+    Whether a cache still matches its CSV: same mtime and size, or, for a file that was
+    touched but not changed, the same sha256 (the new mtime is then recorded).
+    """
+    if meta is None or meta.get("version") != CACHE_VERSION:
+        return False
+    mtime_ns, size = _source_stamp(csv_path)
+    if mtime_ns == meta["mtime_ns"] and size == meta["size"]:
+        return True
+    if size == meta["size"] and file_sha256(csv_path) == meta["sha256"]:
+        meta["mtime_ns"] = mtime_ns
+        try:
+            _write_meta(cache_dir(csv_path), meta)
+        except OSError:
+            pass
+        return True
+    return False
+
+@contextmanager
+def _build_lock(directory):
+    # One rebuild of a cache at a time across processes (pipeline stages, pool workers)
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    with open(f"{directory}.lock", "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+def build_cache(csv_path):
+    """
+    Parse a CSV once and write its columns as memory-mappable blocks: one (n_columns, n_rows)
+    .npy per numeric dtype, and one of integer codes for the string columns, whose distinct
+    (interned) values are kept in meta.json.
+    """
+    directory = cache_dir(csv_path)
+    with _build_lock(directory):
+        return _build(csv_path, directory)
+
+def _fresh_meta(csv_path):
+    # meta of an up-to-date cache, rebuilt first if stale; a process that waited for
+    # another one's rebuild reuses it
+    directory = cache_dir(csv_path)
+    meta = _load_meta(directory)
+    if is_fresh(csv_path, meta):
+        return meta
+    with _build_lock(directory):
+        meta = _load_meta(directory)
+        if is_fresh(csv_path, meta):
+            return meta
+        return _build(csv_path, directory)
+
+def _build(csv_path, directory):
+    # Called with the build lock held, so leftovers of crashed builds can go
+    for leftover in glob.glob(f"{glob.escape(directory)}.tmp*") + glob.glob(f"{glob.escape(directory)}.old*"):
+        shutil.rmtree(leftover, ignore_errors=True)
+
+    tmp_dir = f"{directory}.tmp{os.getpid()}"
+    try:
+        return _write_cache(csv_path, directory, tmp_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def _write_cache(csv_path, directory, tmp_dir):
+    mtime_ns, size = _source_stamp(csv_path)
+    sha256 = file_sha256(csv_path)
+    df = pd.read_csv(csv_path)
+    os.makedirs(tmp_dir)
+
+    columns, blocks, codes = [], {}, []
+    for name in df.columns:
+        values = df[name]
+        if pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype):
+            block = blocks.setdefault(values.dtype.str, [])
+            columns.append({"name": name, "kind": "numeric", "block": values.dtype.str, "row": len(block)})
+            block.append(values.to_numpy())
+        else:
+            categorical = pd.Categorical(values)
+            kind = "category" if len(categorical.categories) <= MAX_CATEGORY_RATIO * len(df) else "strings"
+            columns.append({
+                "name": name, "kind": kind, "dtype": str(values.dtype), "row": len(codes),
+                "categories": categorical.categories.tolist(),
+            })
+            codes.append(categorical.codes.astype(np.int32))
+
+    for i, (dtype, block) in enumerate(blocks.items()):
+        np.save(os.path.join(tmp_dir, f"block{i}-{sha256[:16]}.npy"), np.stack(block) if block else np.empty((0, len(df)), dtype=dtype))
+    np.save(os.path.join(tmp_dir, f"codes-{sha256[:16]}.npy"), np.stack(codes) if codes else np.empty((0, len(df)), dtype=np.int32))
+
+    meta = {"version": CACHE_VERSION, "source": os.path.basename(csv_path), "mtime_ns": mtime_ns,
+            "size": size, "sha256": sha256, "n_rows": len(df), "blocks": list(blocks), "columns": columns}
+    _write_meta(tmp_dir, meta)
+
+    # Move the old cache aside and swap the new one in by renames. Readers that already
+    # mapped the old blocks keep them; block names carry the CSV hash, so a reader holding
+    # the old meta.json fails to find them and retries instead of mixing the two builds
+    old_dir = f"{directory}.old{os.getpid()}"
+    if os.path.exists(directory):
+        os.replace(directory, old_dir)
+    os.replace(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return meta
+
+def _load_frame(directory, meta):
+    blocks = {
+        dtype: np.load(os.path.join(directory, f"block{i}-{meta['sha256'][:16]}.npy"), mmap_mode="r")
+        for i, dtype in enumerate(meta["blocks"])
+    }
+    codes = np.load(os.path.join(directory, f"codes-{meta['sha256'][:16]}.npy"), mmap_mode="r")
+
+    data = {}
+    for column in meta["columns"]:
+        if column["kind"] == "numeric":
+            data[column["name"]] = blocks[column["block"]][column["row"]]
+        else:
+            categorical = pd.Categorical.from_codes(codes[column["row"]], column["categories"])
+            data[column["name"]] = categorical if column["kind"] == "category" else pd.array(categorical, dtype=column["dtype"])
+    return pd.DataFrame(data, copy=False)
+
+# Frames already loaded in this process, keyed by cache directory, with the source stamp they match
+_frames = {}
+
+def read_table(csv_path):
+    """
+    Drop-in for pd.read_csv(csv_path) backed by the column cache. Numeric columns are
+    read-only memory maps shared through the OS page cache, and repeat reads in a process
+    return a shallow copy of the same frame. Both rely on pandas 3 copy-on-write (pinned in
+    requirements.txt): writing to a column copies it first instead of failing on the map. The cache is rebuilt when the CSV
+    changes, by one process at a time. A cache swapped out while it was being read is read
+    again; a read-only data directory, or a second failure, falls back to read_csv.
+    """
+    directory = cache_dir(csv_path)
+    stamp = _source_stamp(csv_path)
+    cached = _frames.get(directory)
+    if cached is not None and cached[0] == stamp:
+        return cached[1].copy(deep=False)
+
+    for _ in range(2):
+        try:
+            frame = _load_frame(directory, _fresh_meta(csv_path))
+            break
+        except (OSError, ValueError, KeyError):
+            continue
+    else:
+        return pd.read_csv(csv_path)
+    _frames[directory] = (stamp, frame)
+    return frame.copy(deep=False)
+
+def _read_cold(path):
+    # What a fresh process pays: meta.json plus the memory maps, no in-process frame
+    _frames.pop(cache_dir(path), None)
+    return read_table(path)
+
+def benchmark_read(paths, repeats=20):
+    """
+    Time pd.read_csv against read_table per file, from a fresh process (cold) and on repeat
+    reads within one (warm).
+    """
+    for path in paths:
+        read_table(path)
+        timings = {}
+        for label, reader in [("read_csv", pd.read_csv), ("cold", _read_cold), ("warm", read_table)]:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                reader(path)
+            timings[label] = (time.perf_counter() - start) / repeats
+        print(f"{os.path.basename(path)}: read_csv {timings['read_csv'] * 1000:6.2f} ms, "
+              f"cache cold {timings['cold'] * 1000:6.2f} ms, warm {timings['warm'] * 1000:6.3f} ms")
+
+if __name__ == "__main__":
+    from .registry import SEASONS, project_path
+    benchmark_read(
+        [project_path("data", f"player_stats_{season}_cleaned.csv") for season in SEASONS]
+        + [project_path("data", "player_stats_2024-25_with_salaries.csv"), project_path("data", "fa_player.csv")]
+    )
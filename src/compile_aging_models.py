@@ -0,0 +1,133 @@
+import time
+import numpy as np
+import pandas as pd
+from joblib import load
+from . import registry
+from .registry import file_sha256
+
+class AgingGrid:
+    """
+    Exact lookup-table form of a 2-input aging forest.
+
+    Every tree splits only on {stat}_last and AGE_last, so the forest is constant on each
+    cell of the grid formed by the union of all split thresholds. grid[i, j] holds the forest
+    prediction for stat cell i and age cell j, and predict() is two searchsorted calls.
+    """
+    def __init__(self, stat_thresholds, age_thresholds, grid, feature_names):
+        self.stat_thresholds = stat_thresholds
+        self.age_thresholds = age_thresholds
+        self.grid = grid
+        self.feature_names = list(feature_names)
+
+    def predict(self, X):
+        # sklearn evaluates splits on float32 inputs, so do the same before comparing
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        i = np.searchsorted(self.stat_thresholds, X[:, 0], side="left")
+        j = np.searchsorted(self.age_thresholds, X[:, 1], side="left")
+        return self.grid[i, j]
+
+    def save(self, path, source_sha256):
+        np.savez_compressed(
+            path,
+            stat_thresholds=self.stat_thresholds,
+            age_thresholds=self.age_thresholds,
+            grid=self.grid,
+            feature_names=np.array(self.feature_names),
+            source_sha256=np.array(source_sha256),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            grid = cls(data["stat_thresholds"], data["age_thresholds"], data["grid"], data["feature_names"])
+            return grid, str(data["source_sha256"])
+
+def _split_thresholds(forest, feature):
+    return np.unique(np.concatenate([
+        est.tree_.threshold[est.tree_.feature == feature] for est in forest.estimators_
+    ]))
+
+def _cell_points(thresholds):
+    """
+    One float32-representable input per cell (t[i-1], t[i]], plus one above the last threshold.
+    """
+    if len(thresholds) == 0:
+        return np.zeros(1)
+    points = thresholds.astype(np.float32)
+    points = np.where(points.astype(np.float64) > thresholds, np.nextafter(points, np.float32(-np.inf)), points)
+    return np.append(points.astype(np.float64), float(np.float32(thresholds[-1]) + 1))
+
+def compile_forest(forest):
+    stat_thresholds = _split_thresholds(forest, 0)
+    age_thresholds = _split_thresholds(forest, 1)
+    stat_points = _cell_points(stat_thresholds)
+    age_points = _cell_points(age_thresholds)
+
+    X = pd.DataFrame({
+        forest.feature_names_in_[0]: np.repeat(stat_points, len(age_points)),
+        forest.feature_names_in_[1]: np.tile(age_points, len(stat_points)),
+    })
+    grid = forest.predict(X).reshape(len(stat_points), len(age_points))
+    return AgingGrid(stat_thresholds, age_thresholds, grid, forest.feature_names_in_)
+
+def verify_grid(forest, grid, n_samples=20000, tol=1e-9, seed=0):
+    """
+    Max abs difference between forest and grid over random inputs spanning every split,
+    fractional and out-of-range ages included. Raises if it exceeds tol.
+    """
+    rng = np.random.default_rng(seed)
+    stat_hi = grid.stat_thresholds[-1] * 1.2 if len(grid.stat_thresholds) else 1
+    X = pd.DataFrame({
+        grid.feature_names[0]: np.concatenate([rng.uniform(0, stat_hi, n_samples), grid.stat_thresholds]),
+        grid.feature_names[1]: np.concatenate([
+            np.where(rng.random(n_samples) < 0.5, rng.integers(17, 46, n_samples), rng.uniform(17, 46, n_samples)),
+            rng.integers(17, 46, len(grid.stat_thresholds)),
+        ]),
+    })
+    max_diff = np.abs(forest.predict(X) - grid.predict(X)).max()
+    if max_diff > tol:
+        raise ValueError(f"Compiled grid differs from forest by {max_diff:.3g} (tol {tol:.3g})")
+    return max_diff
+
+def compile_aging_models(tol=1e-9):
+    """
+    Compile every aging forest to models/player_aging/aging_grid_{stat}.npz after checking
+    it against the forest. The joblib file hash is stored so stale grids are ignored.
+    """
+    for stat in registry.AGING_STATS:
+        model_path = registry.aging_model_path(stat)
+        forest = load(model_path)
+        grid = compile_forest(forest)
+        max_diff = verify_grid(forest, grid, tol=tol)
+        grid.save(registry.aging_grid_path(stat), file_sha256(model_path))
+        print(f"{stat}: {grid.grid.shape[0]}x{grid.grid.shape[1]} grid, max |forest - grid| = {max_diff:.2g}")
+
+def benchmark_aging_models(n_rows=(1, 15, 570, 10000), repeats=5):
+    """
+    Time forest.predict against the compiled grid for all eight models per call.
+    """
+    forests = {stat: load(registry.aging_model_path(stat)) for stat in registry.AGING_STATS}
+    grids = {stat: compile_forest(forest) for stat, forest in forests.items()}
+    rng = np.random.default_rng(0)
+
+    for n in n_rows:
+        inputs = {
+            stat: pd.DataFrame({
+                forest.feature_names_in_[0]: rng.uniform(0, grids[stat].stat_thresholds[-1], n),
+                forest.feature_names_in_[1]: rng.integers(19, 40, n),
+            })
+            for stat, forest in forests.items()
+        }
+        timings = {}
+        for label, models in [("forest", forests), ("grid", grids)]:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                for stat, model in models.items():
+                    model.predict(inputs[stat])
+            timings[label] = (time.perf_counter() - start) / repeats
+        print(f"{n:>6} rows: forest {timings['forest'] * 1000:8.2f} ms, grid {timings['grid'] * 1000:6.3f} ms, "
+              f"speedup {timings['forest'] / timings['grid']:.0f}x")
+
+if __name__ == "__main__":
+    compile_aging_models()
+    benchmark_aging_models()
@@ -0,0 +1,117 @@
+import time
+import numpy as np
+from . import registry
+from .registry import file_sha256
+
+class WinMLP:
+    """
+    Torch-free inference form of MLPRegressor.
+
+    In eval mode each hidden block is Linear -> BatchNorm -> ReLU with dropout inactive, so the
+    BatchNorm running statistics fold into the Linear weights and the network is three
+    matmul + ReLU steps and an output matmul.
+    """
+    def __init__(self, weights, biases):
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+
+    def predict(self, X):
+        h = np.asarray(X, dtype=np.float32)
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            h = np.maximum(h @ w + b, 0)
+        return (h @ self.weights[-1] + self.biases[-1]).ravel()
+
+    def save(self, path, source_sha256):
+        arrays = {}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"w{i}"], arrays[f"b{i}"] = w, b
+        np.savez(path, n_layers=len(self.weights), source_sha256=np.array(source_sha256), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            n_layers = int(data["n_layers"])
+            model = cls([data[f"w{i}"] for i in range(n_layers)], [data[f"b{i}"] for i in range(n_layers)])
+            return model, str(data["source_sha256"])
+
+def fold_batchnorm(linear, bn):
+    """
+    (W, b) of Linear followed by eval-mode BatchNorm1d, with W laid out (in, out) for X @ W.
+    """
+    weight = linear.weight.detach().double().numpy()
+    bias = linear.bias.detach().double().numpy()
+    scale = bn.weight.detach().double().numpy() / np.sqrt(bn.running_var.double().numpy() + bn.eps)
+    shift = bn.bias.detach().double().numpy() - bn.running_mean.double().numpy() * scale
+    return (weight * scale[:, None]).T, bias * scale + shift
+
+def compile_mlp(mlp_model):
+    layers = [fold_batchnorm(linear, bn) for linear, bn in
+              [(mlp_model.fc1, mlp_model.bn1), (mlp_model.fc2, mlp_model.bn2), (mlp_model.fc3, mlp_model.bn3)]]
+    layers.append((mlp_model.out.weight.detach().double().numpy().T, mlp_model.out.bias.detach().double().numpy()))
+    return WinMLP([w for w, _ in layers], [b for _, b in layers])
+
+def _load_torch_model():
+    import torch
+    from .pytorch_model import MLPRegressor
+    mlp_model = MLPRegressor(input_dim = 126)
+    mlp_model.load_state_dict(torch.load(registry.win_model_path(), map_location = torch.device("cpu")))
+    mlp_model.eval()
+    return mlp_model
+
+def _random_rosters(n_samples, seed=0):
+    # Roster-like inputs on the scale of the real features
+    rng = np.random.default_rng(seed)
+    scale = np.array([25, 10, 3, 8, 2, 2, 3, 0.5, 0.4, 3, 0.9, 35, 36, 82], dtype=np.float32)
+    return (rng.random((n_samples, 9, len(scale)), dtype=np.float32) * scale).reshape(n_samples, -1)
+
+def verify_mlp(mlp_model, compiled, n_samples=20000, tol=1e-3, seed=0):
+    """
+    Max abs difference in predicted wins between the torch model and the compiled one.
+    Raises if it exceeds tol.
+    """
+    import torch
+    X = _random_rosters(n_samples, seed)
+    with torch.no_grad():
+        expected = mlp_model(torch.from_numpy(X)).numpy().ravel()
+    max_diff = np.abs(expected - compiled.predict(X)).max()
+    if max_diff > tol:
+        raise ValueError(f"Compiled win model differs from torch by {max_diff:.3g} wins (tol {tol:.3g})")
+    return max_diff
+
+def compile_win_model(tol=1e-3):
+    """
+    Fold the win MLP to models/win_predictor_mlp_simulation.npz after checking it against
+    torch. The .pt file hash is stored so a stale export is ignored.
+    """
+    mlp_model = _load_torch_model()
+    compiled = compile_mlp(mlp_model)
+    max_diff = verify_mlp(mlp_model, compiled, tol=tol)
+    compiled.save(registry.win_model_npz_path(), file_sha256(registry.win_model_path()))
+    print(f"win model: {len(compiled.weights)} layers, max |torch - numpy| = {max_diff:.2g} wins")
+
+def benchmark_win_model(n_rows=(1, 30, 1000, 30000), repeats=20):
+    """
+    Time the torch forward pass against the compiled model per call.
+    """
+    import torch
+    mlp_model = _load_torch_model()
+    compiled = compile_mlp(mlp_model)
+
+    for n in n_rows:
+        X = _random_rosters(n)
+        timings = {}
+        start = time.perf_counter()
+        for _ in range(repeats):
+            with torch.no_grad():
+                mlp_model(torch.from_numpy(X))
+        timings["torch"] = (time.perf_counter() - start) / repeats
+        start = time.perf_counter()
+        for _ in range(repeats):
+            compiled.predict(X)
+        timings["numpy"] = (time.perf_counter() - start) / repeats
+        print(f"{n:>6} rows: torch {timings['torch'] * 1000:8.3f} ms, numpy {timings['numpy'] * 1000:8.3f} ms, "
+              f"speedup {timings['torch'] / timings['numpy']:.1f}x")
+
+if __name__ == "__main__":
+    compile_win_model()
+    benchmark_win_model()
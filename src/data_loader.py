@@ -1,9 +1,10 @@
 import os
 from nba_api.stats.endpoints import teamestimatedmetrics, leaguedashplayerstats
+from .registry import SEASONS, project_path
 
-DATA_DIR = "data"
+DATA_DIR = project_path("data")
 
-def get_team_estimates(seasons=["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"], save=True):
+def get_team_estimates(seasons=SEASONS, save=True):
     
     for season in seasons:
         metrics = teamestimatedmetrics.TeamEstimatedMetrics(season=season)
@@ -15,7 +16,7 @@ def get_team_estimates(seasons=["2020-21", "2021-22", "2022-23", "2023-24", "202
             print(f"{season} season team data saved")
         
 
-def get_player_stats(seasons=["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"], per_mode="Totals", save=True):
+def get_player_stats(seasons=SEASONS, per_mode="Totals", save=True):
     
     for season in seasons:
         stats = leaguedashplayerstats.LeagueDashPlayerStats(
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+from .predict_player_next_season_stats import sample_players_next_season
+from .simulate_team_with_offseason_moves import TOP_N_PLAYERS, can_sign_fa, score_rosters
+
+def optimize_free_agency(state, team_abbr, max_signings=3, budget=None, top_k=10, beam_width=20, n_trials=8, max_candidates=40, rng=None):
+    """
+    Beam search over sets of up to max_signings free agents for the highest predicted wins.
+
+    Each free agent is offered their current salary. Signings follow process_fa_signing's
+    rules in order (Bird rights for the team's own free agents, can_sign_fa otherwise), and
+    the total offered stays within budget (millions) when one is given. The team and the
+    free agent pool are projected once and every candidate roster is scored on the same
+    trials, one batched MLP pass per search level.
+    """
+    team_roster = state.team(team_abbr)
+    roster = team_roster.roster
+    player_data = state.base.player_data
+    fa_rows = player_data[player_data['PLAYER_NAME'].isin(set(state.fa_list))].drop_duplicates('PLAYER_NAME')
+    players = pd.concat([roster, fa_rows], ignore_index=True)
+    names = players['PLAYER_NAME'].tolist()
+    offers = players['SALARY'].to_numpy(dtype=float)
+    bird_rights = (players['TEAM_ABBREVIATION'] == team_abbr).to_numpy()
+
+    predicted_stats = sample_players_next_season(players, n_trials=n_trials, rng=rng)
+    mean_pts = predicted_stats['PTS'].mean(axis=0)
+
+    # Only free agents projected to crack the rotation can change the prediction
+    roster_idx = np.arange(len(roster))
+    fa_idx = np.arange(len(roster), len(players))
+    if len(roster) >= TOP_N_PLAYERS:
+        cutoff = np.sort(mean_pts[roster_idx])[::-1][TOP_N_PLAYERS - 1]
+        fa_idx = fa_idx[mean_pts[fa_idx] > cutoff]
+    candidates = fa_idx[np.argsort(-mean_pts[fa_idx])][:max_candidates].tolist()
+
+    payroll = team_roster.get_salary()
+    baseline_wins = score_rosters(predicted_stats, roster_idx[None, :])[0]
+
+    scored = {}
+    beam = [()]
+    for _ in range(max_signings):
+        expansions = set()
+        for signings in beam:
+            spent = offers[list(signings)].sum()
+            for c in candidates:
+                new = tuple(sorted(signings + (c,)))
+                if c in signings or new in expansions or new in scored:
+                    continue
+                if budget is not None and spent + offers[c] > budget:
+                    continue
+                if not bird_rights[c] and not can_sign_fa(payroll + spent, offers[c]):
+                    continue
+                expansions.add(new)
+        if not expansions:
+            break
+
+        level = sorted(expansions)
+        idx = np.array([roster_idx.tolist() + list(signings) for signings in level])
+        wins = score_rosters(predicted_stats, idx)
+        scored.update(zip(level, wins))
+        beam = [level[i] for i in np.argsort(-wins)[:beam_width]]
+
+    ranked = sorted(scored.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    return {
+        'team': team_abbr,
+        'payroll': round(float(payroll), 1),
+        'baseline_wins': round(float(baseline_wins), 2),
+        'trials': n_trials,
+        'candidates': len(candidates),
+        'rosters_scored': len(scored),
+        'portfolios': [
+            {
+                'signings': [
+                    {'player': names[i], 'salary': float(offers[i]), 'bird_rights': bool(bird_rights[i])}
+                    for i in signings
+                ],
+                'total_salary': round(float(offers[list(signings)].sum()), 1),
+                'predicted_wins': round(float(wins), 2),
+                'win_delta': round(float(wins - baseline_wins), 2),
+            }
+            for signings, wins in ranked
+        ],
+    }
+
+def check_over_cap_signings(base, seed=0):
+    """
+    Search every team at or over the salary cap and return the outside (non-Bird)
+    signings it was recommended; can_sign_fa allows none there, so this should be empty.
+    """
+    from .league_state import LeagueState
+    from .simulate_team_with_offseason_moves import SALARY_CAP_M
+    violations = []
+    for team_abbr, payroll in base.payrolls.items():
+        if payroll < SALARY_CAP_M:
+            continue
+        result = optimize_free_agency(LeagueState(base), team_abbr, rng=np.random.default_rng(seed))
+        violations += [
+            (team_abbr, signing['player'], signing['salary'])
+            for portfolio in result['portfolios'] for signing in portfolio['signings'] if not signing['bird_rights']
+        ]
+    return violations
+
+if __name__ == "__main__":
+    from . import registry
+    violations = check_over_cap_signings(registry.get("league_base"))
+    print(violations or "No outside signings recommended to teams over the cap")
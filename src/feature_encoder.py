@@ -0,0 +1,49 @@
+import numpy as np
+
+TOP_N_PLAYERS = 9
+TOTAL_MINUTES = 240
+
+# Per-player columns of data/team_player_features.csv
+PLAYER_FEATURES = ['PTS', 'REB', 'OREB', 'AST', 'STL', 'BLK', 'TOV', 'FG_PCT', 'FG3_PCT', 'FG3M', 'FT_PCT', 'PLUS_MINUS', 'AGE', 'MIN', 'GP']
+# Per-player win model inputs, in training column order (PLUS_MINUS excluded)
+FEATURE_STATS = [feat for feat in PLAYER_FEATURES if feat != 'PLUS_MINUS']
+
+def feature_columns(features=FEATURE_STATS, n_top=TOP_N_PLAYERS):
+    """
+    Flat column names P1_PTS ... P1_GP, P2_PTS ... in the order flatten_features produces.
+    """
+    return [f'P{i+1}_{feat}' for i in range(n_top) for feat in features]
+
+def encode_top_players(stats, features=FEATURE_STATS, n_top=TOP_N_PLAYERS, mask=None, normalize_minutes=True):
+    """
+    Encode N rosters as an (N, n_top, len(features)) array of their top n_top players by PTS.
+
+    stats maps stat -> (N, R) array. The sort is stable, so ties keep roster order; short
+    rosters are zero-padded, and mask (N, R) marks the real players when rosters of different
+    sizes share R columns. With normalize_minutes, MIN is scaled to TOTAL_MINUTES when the
+    top players exceed it. Returns (top_idx, X).
+    """
+    pts = stats['PTS'] if mask is None else np.where(mask, stats['PTS'], -np.inf)
+    n_rosters, n_players = pts.shape
+    n_slots = min(n_top, n_players)
+    top_idx = np.argsort(-pts, axis=1, kind='stable')[:, :n_slots]
+
+    X = np.zeros((n_rosters, n_top, len(features)))
+    for k, feat in enumerate(features):
+        X[:, :n_slots, k] = np.take_along_axis(stats[feat], top_idx, axis=1)
+    if mask is not None:
+        X[:, :n_slots][~np.take_along_axis(mask, top_idx, axis=1)] = 0
+
+    if normalize_minutes and 'MIN' in features:
+        k = features.index('MIN')
+        minutes = X[:, :, k]
+        total = minutes.sum(axis=1, keepdims=True)
+        over = total > TOTAL_MINUTES
+        X[:, :, k] = np.where(over, np.round(minutes / np.where(over, total, 1) * TOTAL_MINUTES, 1), minutes)
+    return top_idx, X
+
+def flatten_features(X):
+    """
+    (N, n_top, F) encoded rosters -> (N, n_top * F) float32 model input.
+    """
+    return X.reshape(len(X), -1).astype(np.float32)
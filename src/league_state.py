@@ -0,0 +1,218 @@
+import json
+from .simulate_team_with_offseason_moves import TeamRoster
+
+def _to_native(value):
+    return value.item() if hasattr(value, 'item') else value
+
+def roster_delta(team_roster, since, exclude=()):
+    """
+    Changes to a session roster since version `since`, where a roster's version is its move
+    count. Every player moved since then is listed in removed and their current rows (if
+    any) are sent in columnar form, so a client that drops the removed names and appends
+    the rows ends up with the server roster, in order. An unknown version (negative or
+    ahead of the server) gets the full roster with full=True. Rows named in exclude are
+    left out.
+    """
+    version = len(team_roster.moves)
+    roster = team_roster.roster
+    full = not 0 <= since <= version
+    removed = [] if full else list(dict.fromkeys(move[1] for move in team_roster.moves[since:]))
+    rows = roster if full else roster[roster['PLAYER_NAME'].isin(removed)]
+    if exclude:
+        rows = rows[~rows['PLAYER_NAME'].isin(exclude)]
+    columns = rows.to_dict(orient='list')
+    return {
+        'version': version,
+        'since': since,
+        'full': full,
+        'removed': removed,
+        'salary': _to_native(team_roster.get_salary()),
+        'columns': list(columns),
+        'data': list(columns.values()),
+    }
+
+class LeagueBase:
+    """
+    Read-only league table shared by every session. Each team's opening roster
+    (free agents removed) is split out once and shared until a session changes it.
+    """
+    def __init__(self, player_data, fa_list):
+        self.player_data = player_data
+        self.fa_list = list(fa_list)
+        fa_names = set(name.lower().strip() for name in self.fa_list)
+        opening = player_data[~player_data['PLAYER_NAME'].isin(fa_names)]
+        self.rosters = {abbr: roster for abbr, roster in opening.groupby('TEAM_ABBREVIATION')}
+        self.empty_roster = player_data.iloc[0:0]
+
+        # Opening payrolls and contracts, the starting point of every session's CapLedger
+        self.payrolls = {abbr: roster['SALARY'].sum() for abbr, roster in self.rosters.items()}
+        self.contracts = {
+            name: (abbr, salary)
+            for name, abbr, salary in zip(opening['PLAYER_NAME'], opening['TEAM_ABBREVIATION'], opening['SALARY'])
+        }
+        ppg = (player_data['PTS'] / player_data['GP']).where(player_data['GP'] > 0, 0)
+        self.ppg = dict(zip(player_data['PLAYER_NAME'], ppg))
+
+    def player_row(self, player_name):
+        return self.player_data[self.player_data['PLAYER_NAME'] == player_name].iloc[0]
+
+    def team_roster(self, team_abbr, ledger=None):
+        roster = self.rosters.get(team_abbr, self.empty_roster)
+        return TeamRoster(team_abbr, self.player_data, self.fa_list, roster=roster, ledger=ledger)
+
+class CapLedger:
+    """
+    Team payrolls and player contracts for one session, updated incrementally by every
+    TeamRoster move so cap checks are O(1). Only changes against LeagueBase are stored.
+    """
+    def __init__(self, base):
+        self.base = base
+        self.payroll_changes = {}
+        self.contract_changes = {}  # player name -> (team, salary), or None once released
+        # Team of every move in league-wide order: who holds a contract depends on it
+        self.move_teams = []
+
+    def payroll(self, team_abbr):
+        # Rounded so running sums don't drift from the roster total
+        return round(self.base.payrolls.get(team_abbr, 0) + self.payroll_changes.get(team_abbr, 0), 6)
+
+    def contract(self, player_name):
+        if player_name in self.contract_changes:
+            return self.contract_changes[player_name]
+        return self.base.contracts.get(player_name)
+
+    def ppg(self, player_name):
+        return self.base.ppg.get(player_name, 0)
+
+    def add(self, team_abbr, player_name, salary):
+        self.move_teams.append(team_abbr)
+        self.payroll_changes[team_abbr] = self.payroll_changes.get(team_abbr, 0) + salary
+        self.contract_changes[player_name] = (team_abbr, salary)
+
+    def remove(self, team_abbr, player_name, salary):
+        self.move_teams.append(team_abbr)
+        self.payroll_changes[team_abbr] = self.payroll_changes.get(team_abbr, 0) - salary
+        contract = self.contract(player_name)
+        if contract is not None and contract[0] == team_abbr:
+            self.contract_changes[player_name] = None
+
+class LeagueState:
+    """
+    One session's view of the league: the shared LeagueBase plus only the moves made
+    in this session. Team rosters are materialized on first access (copy-on-write).
+    """
+    def __init__(self, base):
+        self.base = base
+        self.team_rosters = {}
+        self.signed_fa = set()
+        self.ledger = CapLedger(base)
+        # Session store revision this state was loaded at (None for a new session)
+        self.revision = None
+
+    def team(self, team_abbr):
+        team_roster = self.team_rosters.get(team_abbr)
+        if team_roster is None:
+            team_roster = self.base.team_roster(team_abbr, ledger=self.ledger)
+            self.team_rosters[team_abbr] = team_roster
+        return team_roster
+
+    def all_teams(self):
+        """
+        TeamRoster for every team in the league, keyed by abbreviation.
+        """
+        return {abbr: self.team(abbr) for abbr in self.base.rosters}
+
+    @property
+    def fa_list(self):
+        return [name for name in self.base.fa_list if name not in self.signed_fa]
+
+    @property
+    def fa_version(self):
+        # Free agents only ever leave the list, so the signed count orders its versions
+        return len(self.signed_fa)
+
+    def fa_delta(self, since):
+        """
+        Free agents signed since fa_version `since`. The signing order is not kept, so every
+        signed name is sent once the client is behind; removing them is idempotent. An
+        unknown version gets the whole list with full=True.
+        """
+        if not 0 <= since <= self.fa_version:
+            return {'version': self.fa_version, 'since': since, 'full': True, 'fa_list': self.fa_list}
+        return {'version': self.fa_version, 'since': since, 'full': False,
+                'removed': sorted(self.signed_fa) if since < self.fa_version else []}
+
+    def remove_fa(self, player_name):
+        if player_name in self.base.fa_list:
+            self.signed_fa.add(player_name)
+
+    def moves(self):
+        """
+        Per-team move log for every team this session changed.
+        """
+        return {abbr: team_roster.moves for abbr, team_roster in self.team_rosters.items() if team_roster.moves}
+
+    def to_delta(self):
+        """
+        Serialize only what this session changed: signed free agents, per-team moves and the
+        team of each move in league-wide order.
+        """
+        delta = {
+            'signed_fa': sorted(self.signed_fa),
+            'moves': {
+                abbr: [[_to_native(value) for value in move] for move in moves]
+                for abbr, moves in self.moves().items()
+            },
+            'order': self.ledger.move_teams
+        }
+        return json.dumps(delta, separators=(',', ':')).encode('utf-8')
+
+    @classmethod
+    def from_delta(cls, base, data):
+        """
+        Rebuild a session by replaying its moves on top of the shared base, in the order
+        they were made (team by team for deltas saved without one).
+        """
+        delta = json.loads(data)
+        state = cls(base)
+        state.signed_fa = set(delta['signed_fa'])
+        moves = {abbr: iter(team_moves) for abbr, team_moves in delta['moves'].items()}
+        order = delta.get('order') or [abbr for abbr, team_moves in delta['moves'].items() for _ in team_moves]
+        for abbr in order:
+            move = next(moves[abbr])
+            team_roster = state.team(abbr)
+            if move[0] == 'add':
+                team_roster.add_player(base.player_row(move[1]), salary=move[2])
+            else:
+                team_roster.remove_player(move[1])
+        return state
+
+def check_delta_round_trip(base, player_name="alperen sengun", other_team="PHX"):
+    """
+    Trade a player away and back, round-trip the session through to_delta/from_delta and
+    check the rebuilt ledger and rosters match the live ones. Returns the mismatches.
+    """
+    state = LeagueState(base)
+    home_team = base.contracts[player_name][0]
+    home, other = state.team(home_team), state.team(other_team)
+    row = base.player_row(player_name)
+    home.remove_player(player_name)
+    other.add_player(row)
+    other.remove_player(player_name)
+    home.add_player(row)
+
+    replayed = LeagueState.from_delta(base, state.to_delta())
+    mismatches = []
+    for abbr in [home_team, other_team]:
+        if replayed.ledger.payroll(abbr) != state.ledger.payroll(abbr):
+            mismatches.append(f"{abbr} payroll")
+        if sorted(replayed.team(abbr).roster['PLAYER_NAME']) != sorted(state.team(abbr).roster['PLAYER_NAME']):
+            mismatches.append(f"{abbr} roster")
+    if replayed.ledger.contract(player_name) != state.ledger.contract(player_name):
+        mismatches.append(f"{player_name} contract: {replayed.ledger.contract(player_name)} != {state.ledger.contract(player_name)}")
+    return mismatches
+
+if __name__ == "__main__":
+    from . import registry
+    mismatches = check_delta_round_trip(registry.get("league_base"))
+    print("\n".join(mismatches) or "Session delta round trip OK")
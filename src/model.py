@@ -4,16 +4,17 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 import joblib
 import os
+from .feature_encoder import feature_columns
+from .registry import project_path
 
-def train_baseline_model(data_path="data/team_player_features.csv", save_path="models/win_predictor_baseline_simulation.pkl"):
+def train_baseline_model(data_path=project_path("data", "team_player_features.csv"), save_path=project_path("models", "win_predictor_baseline_simulation.pkl")):
     # Load dataset
     df = pd.read_csv(data_path)
     
     # Define features and target
-    feature_cols = [col for col in df.columns if col not in ["TEAM_ABBREVIATION", "W", "SEASON", "PLUS_MINUS"]]
     # Exclude +/- stats to make model focus more on other stats
     # This leads to higher MAE and lower r2 score but makes the simulation more realistic and entertainable
-    feature_cols = [col for col in feature_cols if col not in ["P1_PLUS_MINUS", "P2_PLUS_MINUS", "P3_PLUS_MINUS", "P4_PLUS_MINUS", "P5_PLUS_MINUS", "P6_PLUS_MINUS", "P7_PLUS_MINUS", "P8_PLUS_MINUS", "P9_PLUS_MINUS"]]
+    feature_cols = feature_columns()
     X = df[feature_cols]
     y = df["W"]
     
@@ -34,7 +35,7 @@ def train_baseline_model(data_path="data/team_player_features.csv", save_path="m
     print(f"R² Score: {r2:.2f}")
 
     # Ensure models directory exists
-    os.makedirs("models", exist_ok=True)
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
 
     # Save model
     joblib.dump(model, save_path)
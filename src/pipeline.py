@@ -0,0 +1,225 @@
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from .registry import PROJECT_ROOT, SEASONS, AGING_STATS, file_sha256
+
+STATE_PATH = os.path.join(PROJECT_ROOT, ".pipeline_state.json")
+
+class Stage:
+    """
+    One step of the offline pipeline: module.function(**kwargs), reading inputs and writing
+    outputs (paths relative to the project root). code lists the source files whose changes
+    should re-run it besides the stage's own module. Network stages have no inputs and only
+    run when a downstream stage needs a missing output (or with refresh).
+    """
+    def __init__(self, name, module, function, inputs, outputs, kwargs=None, code=(), network=False):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.kwargs = kwargs or {}
+        self.code = [module.replace(".", "/") + ".py"] + list(code)
+        self.network = network
+
+def build_stages(seasons=SEASONS):
+    """
+    The pipeline DAG, in the order the README runs the scripts. Dependencies follow from
+    which stage writes each input file.
+    """
+    stages = []
+    for season in seasons:
+        stages += [
+            Stage(f"fetch_team_estimates[{season}]", "src.data_loader", "get_team_estimates",
+                  [], [f"data/team_estimates_{season}.csv"], {"seasons": [season]}, network=True),
+            Stage(f"fetch_player_stats[{season}]", "src.data_loader", "get_player_stats",
+                  [], [f"data/player_stats_{season}.csv"], {"seasons": [season]}, network=True),
+            Stage(f"clean_team_estimates[{season}]", "src.clean_team_estimates", "clean_team_estimates",
+                  [f"data/team_estimates_{season}.csv"], [f"data/team_estimates_{season}_cleaned.csv"], {"season": season}),
+            Stage(f"clean_player_stats[{season}]", "src.clean_player_stats", "clean_player_stats",
+                  [f"data/player_stats_{season}.csv"], [f"data/player_stats_{season}_cleaned.csv"],
+                  {"input_path": f"data/player_stats_{season}.csv", "output_path": f"data/player_stats_{season}_cleaned.csv"}),
+            Stage(f"build_team_features[{season}]", "src.build_team_features", "build_team_features",
+                  [f"data/player_stats_{season}_cleaned.csv"], [f"data/team_features_{season}.csv"], {"season": season},
+                  code=["src/column_cache.py"]),
+        ]
+
+    cleaned_players = [f"data/player_stats_{season}_cleaned.csv" for season in seasons]
+    cleaned_teams = [f"data/team_estimates_{season}_cleaned.csv" for season in seasons]
+    aging_models = [f"models/player_aging/aging_model_{stat}.joblib" for stat in AGING_STATS]
+    stages += [
+        Stage("build_training_data", "src.build_training_data", "build_training_data",
+              [f"data/team_features_{season}.csv" for season in seasons] + cleaned_teams,
+              ["data/team_training_data.csv"], {"seasons": list(seasons)}, code=["src/column_cache.py"]),
+        Stage("build_team_player_features", "src.build_team_player_features", "build_full_dataset",
+              cleaned_players + cleaned_teams, ["data/team_player_features.csv"], {"seasons": list(seasons)},
+              code=["src/column_cache.py", "src/feature_encoder.py"]),
+        Stage("build_player_aging_dataset", "src.build_player_aging_dataset", "build_player_aging_dataset",
+              cleaned_players, ["data/player_aging_dataset.csv"], {"seasons": list(seasons)},
+              code=["src/column_cache.py"]),
+        Stage("scrape_salaries", "src.pipeline", "scrape_salaries", [], ["data/player_salaries.csv"], network=True),
+        Stage("add_salary_col", "src.add_salary_col", "merge_salaries",
+              ["data/player_stats_2024-25_cleaned.csv", "data/player_salaries.csv"],
+              ["data/player_stats_2024-25_with_salaries.csv"],
+              {"input_path": "data/player_stats_2024-25_cleaned.csv", "salaries_path": "data/player_salaries.csv",
+               "output_path": "data/player_stats_2024-25_with_salaries.csv"}),
+        Stage("train_player_aging_models", "src.train_player_aging_models", "train_player_aging_models",
+              ["data/player_aging_dataset.csv"], aging_models, {"compile_grids": False}, code=["src/column_cache.py"]),
+        Stage("compile_aging_models", "src.compile_aging_models", "compile_aging_models",
+              aging_models, [f"models/player_aging/aging_grid_{stat}.npz" for stat in AGING_STATS]),
+        Stage("train_baseline_model", "src.model", "train_baseline_model",
+              ["data/team_player_features.csv"], ["models/win_predictor_baseline_simulation.pkl"],
+              code=["src/feature_encoder.py"]),
+        Stage("train_mlp", "src.pytorch_model", "train_mlp",
+              ["data/team_player_features.csv"], ["models/win_predictor_mlp_simulation.pt"],
+              code=["src/feature_encoder.py"]),
+        Stage("compile_win_model", "src.compile_win_model", "compile_win_model",
+              ["models/win_predictor_mlp_simulation.pt"], ["models/win_predictor_mlp_simulation.npz"],
+              code=["src/pytorch_model.py"]),
+    ]
+    return stages
+
+def scrape_salaries():
+    from .scrape_salaries import scrape_hoopshype_salaries
+    scrape_hoopshype_salaries().to_csv("data/player_salaries.csv", index=False)
+
+def fingerprint(stage):
+    """
+    Hash of the stage's call, code and input file contents.
+    """
+    digest = hashlib.sha256(json.dumps([stage.module, stage.function, stage.kwargs], sort_keys=True).encode())
+    for path in stage.code + stage.inputs:
+        digest.update(path.encode())
+        digest.update(file_sha256(os.path.join(PROJECT_ROOT, path)).encode())
+    return digest.hexdigest()
+
+def _load_state():
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(state):
+    tmp_path = f"{STATE_PATH}.{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+def _run_stage(module, function, kwargs):
+    # Runs in a worker process; the scripts use paths relative to the project root
+    os.chdir(PROJECT_ROOT)
+    start = time.perf_counter()
+    getattr(importlib.import_module(module), function)(**kwargs)
+    return time.perf_counter() - start
+
+def select_stages(stages, targets):
+    """
+    The given target stages (by name, or name prefix such as "clean_player_stats") and
+    everything upstream of them; all stages when targets is empty.
+    """
+    if not targets:
+        return stages
+    producers = {path: stage for stage in stages for path in stage.outputs}
+    selected, pending = set(), [s for s in stages if any(s.name == t or s.name.startswith(f"{t}[") for t in targets)]
+    if not pending:
+        raise ValueError(f"Unknown stage(s): {', '.join(targets)}")
+    while pending:
+        stage = pending.pop()
+        if stage.name not in selected:
+            selected.add(stage.name)
+            pending.extend(producers[path] for path in stage.inputs if path in producers)
+    return [stage for stage in stages if stage.name in selected]
+
+def run_pipeline(targets=(), processes=None, force=False, refresh=False, dry_run=False, seasons=SEASONS):
+    """
+    Run the stages needed for targets (default: all) in dependency order, up to `processes`
+    at a time. A stage is skipped when its fingerprint matches the last successful run and
+    its outputs exist; force re-runs everything, refresh also re-fetches network sources.
+    Returns {stage name: (status, seconds)}.
+    """
+    stages = select_stages(build_stages(seasons), list(targets))
+    producers = {path: stage.name for stage in stages for path in stage.outputs}
+    upstream = {stage.name: {producers[path] for path in stage.inputs if path in producers} for stage in stages}
+    downstream = {stage.name: [s for s in stages if stage.name in upstream[s.name]] for stage in stages}
+    by_name = {stage.name: stage for stage in stages}
+    state = _load_state()
+    results = {}
+
+    def outputs_exist(stage):
+        return all(os.path.exists(os.path.join(PROJECT_ROOT, path)) for path in stage.outputs)
+
+    def plan(stage):
+        """
+        "skip", "run", or ("blocked", reason) for a stage whose upstream stages are done.
+        """
+        upstream_status = [results[name][0] for name in upstream[stage.name]]
+        if any(status in ("failed", "blocked") for status in upstream_status):
+            return ("blocked", "upstream stage failed")
+        if stage.network:
+            needed = not outputs_exist(stage) and any(not outputs_exist(s) for s in downstream[stage.name])
+            return "run" if refresh or needed else "skip"
+        if "would run" in upstream_status:
+            return "run"
+        missing = [path for path in stage.inputs if not os.path.exists(os.path.join(PROJECT_ROOT, path))]
+        if missing:
+            # e.g. the cleaned season CSVs are checked in without the raw downloads
+            return "skip" if outputs_exist(stage) else ("blocked", f"missing input {missing[0]}")
+        if not force and outputs_exist(stage) and state.get(stage.name, {}).get("fingerprint") == fingerprint(stage):
+            return "skip"
+        return "run"
+
+    waiting = [stage.name for stage in stages]
+    running = {}
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count() or 1) as pool:
+        while waiting or running:
+            for name in [n for n in waiting if upstream[n] <= set(results)]:
+                waiting.remove(name)
+                stage = by_name[name]
+                decision = plan(stage)
+                if decision == "run" and not dry_run:
+                    running[pool.submit(_run_stage, stage.module, stage.function, stage.kwargs)] = stage
+                    print(f"[run]     {name}")
+                else:
+                    status = decision[0] if isinstance(decision, tuple) else ("would run" if decision == "run" else "skipped")
+                    results[name] = (status, 0.0)
+                    print(f"[{status}] {name}" + (f": {decision[1]}" if isinstance(decision, tuple) else ""))
+            if not running:
+                if waiting and not any(upstream[n] <= set(results) for n in waiting):
+                    raise RuntimeError("Pipeline has a dependency cycle")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    results[stage.name] = ("failed", 0.0)
+                    print(f"[failed]  {stage.name}: {e!r}")
+                    continue
+                results[stage.name] = ("ran", seconds)
+                if not stage.network:
+                    state[stage.name] = {"fingerprint": fingerprint(stage), "seconds": round(seconds, 3)}
+                    _save_state(state)
+                print(f"[done]    {stage.name} in {seconds:.2f}s")
+
+    print("\nStage timings:")
+    for name, (status, seconds) in results.items():
+        print(f"  {name:<42} {status:<10} {seconds:8.2f}s")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the offline data/model pipeline incrementally.")
+    parser.add_argument("targets", nargs="*", help="stages to build, with their upstream stages (default: all)")
+    parser.add_argument("--processes", type=int, default=None, help="parallel stage processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-run stages even if up to date")
+    parser.add_argument("--refresh", action="store_true", help="re-download network sources")
+    parser.add_argument("--dry-run", action="store_true", help="show what would run")
+    parser.add_argument("--seasons", nargs="*", default=SEASONS)
+    args = parser.parse_args()
+    run_pipeline(args.targets, args.processes, args.force, args.refresh, args.dry_run, args.seasons)
@@ -1,70 +1,88 @@
+import numpy as np
 import pandas as pd
-from joblib import load
-from .utils import predict_minutes, adjust_shooting_percentage, add_stat_variance, predict_gp, predict_plus_minus, all_years_df
-
-# Load trained aging models (done once at script startup)
-aging_models = {
-    "PTS_per_min": load("models/player_aging/aging_model_PTS_per_min.joblib"),
-    "REB_per_min": load("models/player_aging/aging_model_REB_per_min.joblib"),
-    "OREB_per_min": load("models/player_aging/aging_model_OREB_per_min.joblib"),
-    "AST_per_min": load("models/player_aging/aging_model_AST_per_min.joblib"),
-    "BLK_per_min": load("models/player_aging/aging_model_BLK_per_min.joblib"),
-    "STL_per_min": load("models/player_aging/aging_model_STL_per_min.joblib"),
-    "TOV_per_min": load("models/player_aging/aging_model_TOV_per_min.joblib"),
-    "FG3M": load("models/player_aging/aging_model_FG3M.joblib")
-}
-
-# Load 2024-25 player stats once
-player_df = pd.read_csv("data/player_stats_2024-25_cleaned.csv")
-
-def predict_player_next_season(player_row):
+from .utils import predict_minutes_batch, adjust_shooting_percentage_batch, add_stat_variance, predict_gp_batch, predict_plus_minus_batch
+from . import registry
+
+PER_MIN_STATS = ["PTS", "REB", "OREB", "AST", "STL", "BLK", "TOV"]
+
+def sample_players_next_season(players, n_trials=1, rng=None):
+    """
+    Draw n_trials independent next-season projections for every row of players.
+    The aging models and history lookups run once over all rows; only the noise
+    is drawn per trial, from rng (a numpy Generator; a fresh unseeded one if None).
+    Returns a dict of stat -> (n_trials, n_players) array.
+    """
+    aging_models = registry.get("aging_models")
+    rng = rng if rng is not None else np.random.default_rng()
+    players = players.reset_index(drop=True)
+    n_players = len(players)
+    shape = (n_trials, n_players)
+    age = players["AGE"].to_numpy()
+    total_min = players["MIN"].to_numpy(dtype=float)
+    safe_min = np.where(total_min > 0, total_min, 1)
+
     # Age adjustment
-    age_next = player_row["AGE"] + 1
-    minutes_last = round(player_row["MIN"] / player_row["GP"], 1)
+    age_next = age + 1
+    minutes_last = np.round(total_min / players["GP"].to_numpy(dtype=float), 1)
 
     # Predict minutes
-    pts_per_min_last = player_row["PTS"] / player_row["MIN"] if player_row["MIN"] > 0 else 0
-    predicted_minutes = predict_minutes(minutes_last, age_next, pts_per_min_last)
+    pts_per_min_last = np.where(total_min > 0, players["PTS"].to_numpy(dtype=float) / safe_min, 0)
+    predicted_minutes = predict_minutes_batch(minutes_last, age_next, pts_per_min_last, size=shape, rng=rng)
 
     # Predict per-minute stats
     predicted_stats = {}
 
-    for stat in ["PTS", "REB", "OREB", "AST", "STL", "BLK", "TOV"]:
-        stat_per_min_last = player_row[stat] / player_row["MIN"] if player_row["MIN"] > 0 else 0
+    for stat in PER_MIN_STATS:
+        stat_per_min_last = np.where(total_min > 0, players[stat].to_numpy(dtype=float) / safe_min, 0)
         model = aging_models[f"{stat}_per_min"]
-        X_pred = pd.DataFrame(
-            [[stat_per_min_last, player_row["AGE"]]],
-            columns=[f"{stat}_per_min_last", "AGE_last"]
-        )
-        predicted_per_min = model.predict(X_pred)[0]
-        predicted_total = predicted_per_min * predicted_minutes
-        predicted_total = add_stat_variance(predicted_total)
-        predicted_stats[stat] = round(predicted_total, 1)
+        X_pred = pd.DataFrame({f"{stat}_per_min_last": stat_per_min_last, "AGE_last": age})
+        predicted_total = model.predict(X_pred) * predicted_minutes
+        predicted_stats[stat] = np.round(add_stat_variance(predicted_total, rng=rng), 1)
 
     # Predict FG3M, GP, PLUS_MINUS
-    predicted_stats["GP"] = min(82, round(add_stat_variance(predict_gp(player_row))))
+    gp_base = predict_gp_batch(players)
+    predicted_stats["GP"] = np.minimum(82, np.round(add_stat_variance(np.broadcast_to(gp_base, shape), rng=rng)))
     model = aging_models["FG3M"]
-    X_pred = pd.DataFrame([[player_row["FG3M"], player_row["AGE"]]], columns=["FG3M_last", "AGE_last"])
-    predicted_fg3m = model.predict(X_pred)[0]
-    predicted_stats["FG3M"] = round(add_stat_variance(predicted_fg3m / predicted_stats["GP"]), 1)
-    predicted_stats["PLUS_MINUS"] = round(add_stat_variance(predict_plus_minus(player_row) / predicted_stats["GP"]), 1)
+    X_pred = pd.DataFrame({"FG3M_last": players["FG3M"].to_numpy(), "AGE_last": age})
+    predicted_fg3m = model.predict(X_pred)
+    predicted_stats["FG3M"] = np.round(add_stat_variance(predicted_fg3m / predicted_stats["GP"], rng=rng), 1)
+    pm_base = predict_plus_minus_batch(players)
+    predicted_stats["PLUS_MINUS"] = np.round(add_stat_variance(pm_base / predicted_stats["GP"], rng=rng), 1)
 
     # Predict shooting percentages
-    predicted_stats["FG_PCT"] = adjust_shooting_percentage(player_row["FG_PCT"], age_next)
-    predicted_stats["FG3_PCT"] = adjust_shooting_percentage(player_row["FG3_PCT"], age_next)
-    predicted_stats["FT_PCT"] = adjust_shooting_percentage(player_row["FT_PCT"], age_next)
+    for stat in ["FG_PCT", "FG3_PCT", "FT_PCT"]:
+        predicted_stats[stat] = adjust_shooting_percentage_batch(players[stat].to_numpy(), age_next, size=shape, rng=rng)
 
     # Predict minutes and age
     predicted_stats["MIN"] = predicted_minutes
-    predicted_stats["AGE"] = age_next
+    predicted_stats["AGE"] = np.broadcast_to(age_next, shape)
 
     return predicted_stats
 
+def predict_players_next_season(players, rng=None):
+    """
+    Batched version of predict_player_next_season for a whole roster (or the whole league).
+    Returns a DataFrame with one row of predicted stats per input row, in input order.
+    """
+    predicted_stats = sample_players_next_season(players, n_trials=1, rng=rng)
+    pred_df = pd.DataFrame({stat: values[0] for stat, values in predicted_stats.items()})
+    pred_df["GP"] = pred_df["GP"].astype(int)
+    return pred_df
+
+def predict_player_next_season(player_row, rng=None):
+    """
+    Predict next season's stat line for a single player row.
+    """
+    pred_df = predict_players_next_season(pd.DataFrame([player_row]), rng=rng)
+    return pred_df.to_dict("records")[0]
+
 def predict_by_name_or_id(player_identifier):
     """
     Look up player by PLAYER_NAME or PLAYER_ID from 2024-25 dataset
     and predict next season's stat line.
     """
+    player_df = registry.get("player_stats")
+
     # PLAYER_ID (numeric search)
     if isinstance(player_identifier, int):
         player_row = player_df[player_df["PLAYER_ID"] == player_identifier]
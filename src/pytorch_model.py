@@ -1,24 +1,17 @@
 import pandas as pd
+import numpy as np
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader, Dataset
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import KFold, train_test_split
 from sklearn.metrics import mean_absolute_error, r2_score
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 import os
+import time
+from .feature_encoder import feature_columns
+from .registry import project_path, win_model_path
 
-# Dataset Class
-class TeamDataset(Dataset):
-    def __init__(self, dataframe, feature_cols, target_col):
-        self.X = dataframe[feature_cols].values
-        self.y = dataframe[target_col].values
-    
-    def __len__(self):
-        return len(self.y)
-    
-    def __getitem__(self, idx):
-        return torch.tensor(self.X[idx], dtype = torch.float32), torch.tensor(self.y[idx], dtype = torch.float32)
-    
-# MLP Model   
+# MLP Model
 class MLPRegressor(nn.Module):
     def __init__(self, input_dim):
         super().__init__()
@@ -38,60 +31,170 @@ class MLPRegressor(nn.Module):
         x3 = self.relu(self.bn3(self.fc3(self.dropout(x2))))
         return self.out(self.dropout(x3))
 
-# Training function
-def train_mlp(data_path="data/team_player_features.csv", save_path="models/win_predictor_mlp_simulation.pt", epochs=200, batch_size=8, lr=0.001):
+def load_training_data(data_path=project_path("data", "team_player_features.csv")):
+    """
+    (X, y) float32 arrays of the win model inputs and W.
+    """
     df = pd.read_csv(data_path)
-    feature_cols = [col for col in df.columns if col not in ["TEAM_ABBREVIATION", "W", "SEASON"]]
     # Exclude +/- stats to make model focus more on other stats
     # This leads to higher MAE and lower r2 score but makes the simulation more realistic and entertainable
-    feature_cols = [col for col in feature_cols if col not in ["P1_PLUS_MINUS", "P2_PLUS_MINUS", "P3_PLUS_MINUS", "P4_PLUS_MINUS", "P5_PLUS_MINUS", "P6_PLUS_MINUS", "P7_PLUS_MINUS", "P8_PLUS_MINUS", "P9_PLUS_MINUS"]]
-    print(f"feature cols: {len(feature_cols)}")
-    target_col = "W"
-
-    X_train, X_test, y_train, y_test = train_test_split(df[feature_cols], df[target_col], test_size=0.2, random_state=42)
-
-    train_df = pd.concat([X_train, y_train], axis=1)
-    test_df = pd.concat([X_test, y_test], axis=1)
-
-    train_dataset = TeamDataset(train_df, feature_cols, target_col)
-    test_dataset = TeamDataset(test_df, feature_cols, target_col)
-
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
+    return df[feature_columns()].to_numpy(dtype=np.float32), df["W"].to_numpy(dtype=np.float32)
 
+def fit_mlp(X_train, y_train, X_val=None, y_val=None, epochs=200, batch_size=8, lr=0.001, weight_decay=1e-4, patience=None, seed=None, verbose=False):
+    """
+    Train an MLPRegressor on in-memory arrays. The data is moved to the device once as two
+    tensors and each epoch slices a random permutation of them into batches, with no
+    per-sample Dataset/DataLoader overhead. With validation data and patience, training stops
+    after patience epochs without a lower validation MSE and the best weights are kept.
+    Returns (model in eval mode, epochs run).
+    """
+    if seed is not None:
+        torch.manual_seed(seed)
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model = MLPRegressor(input_dim=len(feature_cols)).to(device)
+    X = torch.as_tensor(X_train, dtype=torch.float32, device=device)
+    y = torch.as_tensor(y_train, dtype=torch.float32, device=device).reshape(-1, 1)
+    early_stopping = X_val is not None and patience is not None
+    if early_stopping:
+        X_val = torch.as_tensor(X_val, dtype=torch.float32, device=device)
+        y_val = torch.as_tensor(y_val, dtype=torch.float32, device=device).reshape(-1, 1)
 
+    model = MLPRegressor(input_dim=X.shape[1]).to(device)
     criterion = nn.MSELoss()
-    optimizer = torch.optim.Adam(model.parameters(), lr=lr, weight_decay = 1e-4)
+    try:
+        # One fused kernel per step instead of a Python loop over the parameters
+        optimizer = torch.optim.Adam(model.parameters(), lr=lr, weight_decay=weight_decay, fused=True)
+    except (RuntimeError, TypeError):
+        optimizer = torch.optim.Adam(model.parameters(), lr=lr, weight_decay=weight_decay)
+    best_loss, best_state, stale = float("inf"), None, 0
 
     for epoch in range(epochs):
         model.train()
-        for X_batch, y_batch in train_loader:
-            X_batch, y_batch = X_batch.to(device), y_batch.to(device).unsqueeze(1)
+        order = torch.randperm(len(X), device=device)
+        for start in range(0, len(X), batch_size):
+            idx = order[start:start + batch_size]
+            # BatchNorm needs more than one row per batch
+            if len(idx) < 2:
+                continue
             optimizer.zero_grad()
-            preds = model(X_batch)
-            loss = criterion(preds, y_batch)
+            loss = criterion(model(X[idx]), y[idx])
             loss.backward()
             optimizer.step()
 
-        if (epoch+1) % 50 == 0:
+        if verbose and (epoch+1) % 50 == 0:
             print(f"Epoch {epoch+1}/{epochs} - Loss: {loss.item():.4f}")
 
-    # Evaluate
+        if early_stopping:
+            model.eval()
+            with torch.no_grad():
+                val_loss = criterion(model(X_val), y_val).item()
+            if val_loss < best_loss:
+                best_loss, stale = val_loss, 0
+                best_state = {name: value.detach().clone() for name, value in model.state_dict().items()}
+            else:
+                stale += 1
+                if stale >= patience:
+                    break
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
     model.eval()
+    return model, epoch + 1
+
+def evaluate_mlp(model, X, y):
+    """
+    (MAE, R²) of a trained model on arrays X, y.
+    """
+    device = next(model.parameters()).device
     with torch.no_grad():
-        X_test_tensor = torch.tensor(X_test.values, dtype=torch.float32).to(device)
-        preds = model(X_test_tensor).cpu().numpy().flatten()
-        mae = mean_absolute_error(y_test, preds)
-        r2 = r2_score(y_test, preds)
+        preds = model(torch.as_tensor(X, dtype=torch.float32, device=device)).cpu().numpy().flatten()
+    return mean_absolute_error(y, preds), r2_score(y, preds)
+
+# Training function
+def train_mlp(data_path=project_path("data", "team_player_features.csv"), save_path=win_model_path(), epochs=200, batch_size=8, lr=0.001, patience=None, val_fraction=0.1, seed=None):
+    X, y = load_training_data(data_path)
+    print(f"feature cols: {X.shape[1]}")
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-    print(f"PyTorch MLP Model trained")
+    # Early stopping holds out part of the training split, never the test split
+    X_val = y_val = None
+    if patience is not None:
+        X_train, X_val, y_train, y_val = train_test_split(X_train, y_train, test_size=val_fraction, random_state=42)
+
+    start = time.perf_counter()
+    model, epochs_run = fit_mlp(X_train, y_train, X_val, y_val, epochs=epochs, batch_size=batch_size, lr=lr,
+                                patience=patience, seed=seed, verbose=True)
+    seconds = time.perf_counter() - start
+
+    # Evaluate
+    mae, r2 = evaluate_mlp(model, X_test, y_test)
+
+    print(f"PyTorch MLP Model trained ({epochs_run} epochs in {seconds:.1f}s)")
     print(f"MAE: {mae:.2f} wins")
     print(f"R² Score: {r2:.2f}")
 
-    os.makedirs("models", exist_ok=True)
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
     torch.save(model.state_dict(), save_path)
     print(f"Model saved at {save_path}")
 
+# Configurations tried by sweep_mlp by default; each is a set of fit_mlp keyword arguments
+DEFAULT_SWEEP = [
+    {"batch_size": batch_size, "lr": lr, "weight_decay": 1e-4, "epochs": 200, "patience": 20}
+    for batch_size in [8, 16, 32] for lr in [0.001, 0.003]
+]
+
+def _cross_validate_fold(X, y, config, train_idx, test_idx, val_fraction, seed):
+    # Runs in a worker process: one configuration on one fold
+    torch.set_num_threads(1)
+    X_train, y_train = X[train_idx], y[train_idx]
+    X_val = y_val = None
+    if config.get("patience") is not None:
+        X_train, X_val, y_train, y_val = train_test_split(X_train, y_train, test_size=val_fraction, random_state=seed)
+    start = time.perf_counter()
+    model, epochs_run = fit_mlp(X_train, y_train, X_val, y_val, seed=seed, **config)
+    seconds = time.perf_counter() - start
+    mae, r2 = evaluate_mlp(model, X[test_idx], y[test_idx])
+    return seconds, epochs_run, mae, r2
+
+def sweep_mlp(configs=DEFAULT_SWEEP, data_path=project_path("data", "team_player_features.csv"), folds=5, processes=None, val_fraction=0.1, seed=42):
+    """
+    k-fold cross-validation of each configuration, with every (configuration, fold) fit run
+    as its own job across processes. Prints and returns one row per configuration: mean
+    MAE and R² over the held-out folds, mean epochs run, and the training seconds summed
+    over its folds.
+    """
+    X, y = load_training_data(data_path)
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=seed).split(X))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count() or 1) as pool:
+        futures = [
+            [pool.submit(_cross_validate_fold, X, y, config, train_idx, test_idx, val_fraction, seed + k)
+             for k, (train_idx, test_idx) in enumerate(splits)]
+            for config in configs
+        ]
+        fold_results = [[future.result() for future in config_futures] for config_futures in futures]
+    wall = time.perf_counter() - start
+
+    results = []
+    for config, folds_run in zip(configs, fold_results):
+        seconds, epochs_run, mae, r2 = np.array(folds_run).T
+        results.append({**config, "train_seconds": round(float(seconds.sum()), 2), "epochs_run": float(epochs_run.mean()),
+                        "mae": round(float(mae.mean()), 3), "r2": round(float(r2.mean()), 3)})
+
+    print(pd.DataFrame(results).sort_values("mae").to_string(index=False))
+    print(f"{len(configs)} configurations x {folds} folds in {wall:.1f}s wall-clock")
+    return results
+
 if __name__ == "__main__":
-    train_mlp()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the win MLP, or cross-validate a hyperparameter sweep.")
+    parser.add_argument("--sweep", action="store_true", help="run sweep_mlp over DEFAULT_SWEEP instead of training")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--patience", type=int, default=None, help="early stopping patience in epochs")
+    args = parser.parse_args()
+    if args.sweep:
+        sweep_mlp(folds=args.folds, processes=args.processes)
+    else:
+        train_mlp(batch_size=args.batch_size, patience=args.patience)
@@ -0,0 +1,206 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# All artifact paths resolve from the project root, independent of the working directory
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEASONS = ["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"]
+AGING_STATS = ["PTS_per_min", "REB_per_min", "OREB_per_min", "AST_per_min", "STL_per_min",
+               "BLK_per_min", "TOV_per_min", "FG3M"]
+
+_loaders = {}
+_artifacts = {}
+_load_info = {}
+_lock = threading.RLock()
+
+def project_path(*parts):
+    return os.path.join(PROJECT_ROOT, *parts)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def aging_model_path(stat):
+    return project_path("models", "player_aging", f"aging_model_{stat}.joblib")
+
+def aging_grid_path(stat):
+    return project_path("models", "player_aging", f"aging_grid_{stat}.npz")
+
+def win_model_path():
+    return project_path("models", "win_predictor_mlp_simulation.pt")
+
+def win_model_npz_path():
+    return project_path("models", "win_predictor_mlp_simulation.npz")
+
+# Artifacts built from the model files model_version covers
+MODEL_ARTIFACTS = ["aging_models", "win_model"]
+
+def model_version():
+    """
+    (path, mtime, size) of every model file the simulation loads; changes whenever a model
+    is retrained or recompiled.
+    """
+    paths = [aging_model_path(stat) for stat in AGING_STATS] + [aging_grid_path(stat) for stat in AGING_STATS]
+    version = []
+    for path in paths + [win_model_path(), win_model_npz_path()]:
+        try:
+            st = os.stat(path)
+            version.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            version.append((path, None, None))
+    return tuple(version)
+
+def register(name):
+    """
+    Register a zero-argument loader for an artifact. Loaders run at most once per process.
+    """
+    def decorator(loader):
+        _loaders[name] = loader
+        return loader
+    return decorator
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def get(name):
+    """
+    Return an artifact, loading it on first use.
+    """
+    artifact = _artifacts.get(name)
+    if artifact is not None:
+        return artifact
+
+    with _lock:
+        if name not in _artifacts:
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            _artifacts[name] = _loaders[name]()
+            seconds = time.perf_counter() - start
+            rss_delta = _rss_bytes() - rss_before
+            _load_info[name] = {"seconds": round(seconds, 4), "rss_delta_mb": round(rss_delta / 2**20, 1)}
+            logger.info("Loaded %s in %.3fs (RSS %+.1f MB)", name, seconds, rss_delta / 2**20)
+        return _artifacts[name]
+
+def unload(names):
+    """
+    Drop loaded artifacts so the next get loads them again, e.g. after a model was retrained.
+    """
+    with _lock:
+        for name in names:
+            _artifacts.pop(name, None)
+            _load_info.pop(name, None)
+
+def warmup(names=None):
+    """
+    Load the given artifacts (all registered ones by default), e.g. from a startup hook.
+    """
+    for name in names or list(_loaders):
+        get(name)
+    return status()
+
+def status():
+    """
+    Load state of every registered artifact, with per-artifact load time and RSS delta.
+    """
+    return {name: {"loaded": name in _artifacts, **_load_info.get(name, {})} for name in _loaders}
+
+def is_ready(names=None):
+    return all(name in _artifacts for name in names or _loaders)
+
+# Data
+
+@register("season_stats")
+def _load_season_stats():
+    import pandas as pd
+    from .column_cache import read_table
+    all_years_df = pd.concat([
+        read_table(project_path("data", f"player_stats_{season}_cleaned.csv"))
+        for season in SEASONS
+    ])
+    all_years_df['PLAYER_NAME'] = all_years_df['PLAYER_NAME'].str.lower().str.strip()
+    return all_years_df
+
+@register("player_history")
+def _load_player_history():
+    from .utils import PlayerHistoryIndex
+    return PlayerHistoryIndex(get("season_stats"))
+
+@register("player_stats")
+def _load_player_stats():
+    from .column_cache import read_table
+    return read_table(project_path("data", "player_stats_2024-25_cleaned.csv"))
+
+@register("salary_table")
+def _load_salary_table():
+    from .column_cache import read_table
+    return read_table(project_path("data", "player_stats_2024-25_with_salaries.csv"))
+
+@register("fa_list")
+def _load_fa_list():
+    from .column_cache import read_table
+    return read_table(project_path("data", "fa_player.csv"))['PLAYER_NAME'].tolist()
+
+@register("league_table")
+def _load_league_table():
+    # Salary table with SALARY in millions, as used by the API
+    player_data = get("salary_table").copy()
+    player_data["SALARY"] = round(player_data["SALARY"] / 1000000, 1)
+    return player_data
+
+@register("per_game_table")
+def _load_per_game_table():
+    # League table with PTS/REB/AST/MIN per game, for the FA catalog
+    player_df = get("league_table").copy()
+    for stat in ["PTS", "REB", "AST", "MIN"]:
+        player_df[stat] = round(player_df[stat] / player_df["GP"], 1)
+    return player_df
+
+@register("league_base")
+def _load_league_base():
+    from .league_state import LeagueBase
+    return LeagueBase(get("league_table"), get("fa_list"))
+
+# Models
+
+@register("aging_models")
+def _load_aging_models():
+    # Compiled lookup grids (src/compile_aging_models.py) when they match the forest on disk
+    from joblib import load
+    from .compile_aging_models import AgingGrid
+    aging_models = {}
+    for stat in AGING_STATS:
+        model_path, grid_path = aging_model_path(stat), aging_grid_path(stat)
+        if os.path.exists(grid_path):
+            grid, source_sha256 = AgingGrid.load(grid_path)
+            if source_sha256 == file_sha256(model_path):
+                aging_models[stat] = grid
+                continue
+            logger.warning("Compiled grid for %s is stale, using the forest", stat)
+        aging_models[stat] = load(model_path)
+    return aging_models
+
+@register("win_model")
+def _load_win_model():
+    # BatchNorm-folded NumPy export (src/compile_win_model.py) when it matches the .pt on disk,
+    # so serving does not need torch
+    from .compile_win_model import WinMLP, _load_torch_model
+    npz_path = win_model_npz_path()
+    if os.path.exists(npz_path):
+        mlp_model, source_sha256 = WinMLP.load(npz_path)
+        if source_sha256 == file_sha256(win_model_path()):
+            return mlp_model
+        logger.warning("Compiled win model is stale, using torch")
+    return _load_torch_model()
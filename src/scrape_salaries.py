@@ -2,6 +2,7 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import os
+from .registry import project_path
 
 def scrape_hoopshype_salaries():
     url = "https://hoopshype.com/salaries/players/"
@@ -36,6 +37,7 @@ if __name__ == "__main__":
     df = scrape_hoopshype_salaries()
 
     # Save to CSV
-    df.to_csv("data/player_salaries.csv", index=False)
+    output_path = project_path("data", "player_salaries.csv")
+    df.to_csv(output_path, index=False)
 
-    print(f"Saved {len(df)} records to data/player_salaries.csv")
+    print(f"Saved {len(df)} records to {output_path}")
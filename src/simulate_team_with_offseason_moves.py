@@ -1,23 +1,39 @@
-import torch
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-from .pytorch_model import MLPRegressor
-from .predict_player_next_season_stats import predict_player_next_season
+from . import registry
+from .predict_player_next_season_stats import sample_players_next_season
+from .feature_encoder import TOP_N_PLAYERS, FEATURE_STATS, encode_top_players, flatten_features
 
 # Constants
 SALARY_CAP = 187895000  # Luxury Tax Threshold
 SECOND_APRON = 207824000
-TOP_N_PLAYERS = 9
+# Session payrolls and offers come from the league table, where SALARY is in millions
+SALARY_CAP_M = SALARY_CAP / 1000000
+SECOND_APRON_M = SECOND_APRON / 1000000
+# Rosters scored per MLP forward pass in score_rosters
+SCORING_BATCH_ROWS = 16384
 
-mlp_model = MLPRegressor(input_dim = 126)
-mlp_model.load_state_dict(torch.load("models/win_predictor_mlp_simulation.pt", map_location = torch.device("cpu")))
-mlp_model.eval()
+SUMMARY_STATS = ['PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'FG3M', 'FG_PCT', 'FG3_PCT', 'FT_PCT', 'MIN', 'GP', 'PLUS_MINUS']
+WIN_PERCENTILES = [5, 25, 50, 75, 95]
+
+CONFERENCES = {
+    "East": ["ATL", "BOS", "BKN", "CHA", "CHI", "CLE", "DET", "IND", "MIA", "MIL", "NYK", "ORL", "PHI", "TOR", "WAS"],
+    "West": ["DAL", "DEN", "GSW", "HOU", "LAC", "LAL", "MEM", "MIN", "NOP", "OKC", "PHX", "POR", "SAC", "SAS", "UTA"],
+}
+TEAM_CONFERENCE = {abbr: conf for conf, teams in CONFERENCES.items() for abbr in teams}
 
 class TeamRoster:
-    def __init__(self, team_abbr, player_data, fa_list):
+    def __init__(self, team_abbr, player_data, fa_list, roster=None, ledger=None):
         self.team_abbr = team_abbr
-        self.df = player_data.copy()
+        self.df = player_data  # shared league table, never modified
         self.fa_list = set(name.lower().strip() for name in fa_list)
-        self.roster = self.build_initial_roster()
+        # Opening roster may be shared with other sessions; moves replace it rather than modify it
+        self.roster = roster if roster is not None else self.build_initial_roster()
+        # Signings, trades and releases applied on top of the opening roster
+        self.moves = []
+        # Optional session CapLedger kept in sync with every move
+        self.ledger = ledger
 
     def build_initial_roster(self):
         roster = self.df[self.df["TEAM_ABBREVIATION"] == self.team_abbr]
@@ -25,6 +41,8 @@ class TeamRoster:
         return roster
 
     def get_salary(self):
+        if self.ledger is not None:
+            return self.ledger.payroll(self.team_abbr)
         return self.roster['SALARY'].sum()
 
     def display_roster(self):
@@ -32,12 +50,21 @@ class TeamRoster:
         print(self.roster[['PLAYER_NAME', 'AGE', 'SALARY']])
 
     def add_player(self, player_row, salary=None):
+        player_row = player_row.copy()
         if salary:
             player_row['SALARY'] = salary
         self.roster = pd.concat([self.roster, pd.DataFrame([player_row])], ignore_index=True)
+        self.moves.append(('add', player_row['PLAYER_NAME'], player_row['SALARY']))
+        if self.ledger is not None:
+            self.ledger.add(self.team_abbr, player_row['PLAYER_NAME'], player_row['SALARY'])
 
     def remove_player(self, player_name):
-        self.roster = self.roster[self.roster['PLAYER_NAME'] != player_name]
+        mask = self.roster['PLAYER_NAME'] != player_name
+        if not mask.all():
+            if self.ledger is not None:
+                self.ledger.remove(self.team_abbr, player_name, self.roster.loc[~mask, 'SALARY'].sum())
+            self.roster = self.roster[mask]
+            self.moves.append(('remove', player_name))
 
 def process_fa_signing(team_roster, player_name, offer_salary, df):
     
@@ -62,7 +89,7 @@ def process_fa_signing(team_roster, player_name, offer_salary, df):
             messages.append(msg2)
         
     else:
-        if current_salary < SALARY_CAP and current_salary + offer_salary <= SECOND_APRON:
+        if can_sign_fa(current_salary, offer_salary):
             team_roster.add_player(player_row, salary=offer_salary)
             msg3 = f"Signed {player_name} as FA at ${offer_salary}M"
             #print(msg3)
@@ -76,44 +103,61 @@ def process_fa_signing(team_roster, player_name, offer_salary, df):
     return messages
 
 
-def process_trade(team_roster, players_out, players_in, partner_abbr, df):
-    
+def can_sign_fa(payroll, offer_salary):
+    """
+    Whether a team with this payroll may sign an outside free agent at offer_salary
+    (both in millions).
+    """
+    return payroll < SALARY_CAP_M and payroll + offer_salary <= SECOND_APRON_M
+
+def max_incoming_salary(payroll, outgoing_salary):
+    """
+    Salary a team may take back in a trade: 200% of outgoing below the cap, 125% above it.
+    Payroll in millions; works on scalars and numpy arrays.
+    """
+    return outgoing_salary * np.where(payroll < SALARY_CAP_M, 2, 1.25)
+
+def total_ppg(players):
+    return (players['PTS'] / players['GP']).where(players['GP'] > 0, 0).sum()
+
+def process_trade(team_roster, players_out, players_in, partner_abbr, df, partner_roster=None):
+    """
+    Validate and apply a trade. With partner_roster (the partner's session TeamRoster),
+    incoming players and the partner payroll come from the session and both sides are
+    updated together; otherwise they come from df and only team_roster is updated.
+    """
     messages = []
     
     players_out = [p.lower().strip() for p in players_out]
     players_in = [p.lower().strip() for p in players_in]
 
     outgoing = team_roster.roster[team_roster.roster['PLAYER_NAME'].isin(players_out)]
-    incoming = df[(df['TEAM_ABBREVIATION'] == partner_abbr) & (df['PLAYER_NAME'].isin(players_in))]
+    if partner_roster is not None:
+        incoming = partner_roster.roster[partner_roster.roster['PLAYER_NAME'].isin(players_in)]
+        partner_salary = partner_roster.get_salary()
+    else:
+        incoming = df[(df['TEAM_ABBREVIATION'] == partner_abbr) & (df['PLAYER_NAME'].isin(players_in))]
+        partner_salary = df.loc[df['TEAM_ABBREVIATION'] == partner_abbr, 'SALARY'].sum()
 
     out_salary = outgoing['SALARY'].sum()
     in_salary = incoming['SALARY'].sum()
 
     user_salary = team_roster.get_salary()
-    user_max_incoming = out_salary * (2 if user_salary < SALARY_CAP else 1.25)
-    if in_salary > user_max_incoming:
+    if in_salary > max_incoming_salary(user_salary, out_salary):
         msg1 = f"Invalid trade: incoming salary too high for {team_roster.team_abbr}."
         #print(msg1)
         messages.append(msg1)
         return messages
 
     # Check partner team
-    partner_roster = df[df['TEAM_ABBREVIATION'] == partner_abbr]
-    partner_salary = partner_roster['SALARY'].sum()
-    partner_out = incoming['SALARY'].sum()
-    partner_in = outgoing['SALARY'].sum()
-
-    partner_max_incoming = partner_out * (2 if partner_salary < SALARY_CAP else 1.25)
-    if partner_in > partner_max_incoming:
+    if out_salary > max_incoming_salary(partner_salary, in_salary):
         msg2 = f"Invalid trade for {partner_abbr}: incoming salary too high."
         #print(msg2)
         messages.append(msg2)
         return messages
 
     # PPG realism warning
-    out_ppg = outgoing.apply(lambda r: r['PTS']/r['GP'] if r['GP'] > 0 else 0, axis=1).sum()
-    in_ppg = incoming.apply(lambda r: r['PTS']/r['GP'] if r['GP'] > 0 else 0, axis=1).sum()
-    if abs(out_ppg - in_ppg) > 10:
+    if abs(total_ppg(outgoing) - total_ppg(incoming)) > 10:
         msg3 = f"\nLooks like this trade might be unrealistic in real life"
         #print(msg3)
         messages.append(msg3)
@@ -123,6 +167,11 @@ def process_trade(team_roster, players_out, players_in, partner_abbr, df):
         team_roster.remove_player(name)
     for _, row in incoming.iterrows():
         team_roster.add_player(row)
+    if partner_roster is not None:
+        for name in incoming['PLAYER_NAME']:
+            partner_roster.remove_player(name)
+        for _, row in outgoing.iterrows():
+            partner_roster.add_player(row)
         
     msg4 = f"\nTrade completed with {partner_abbr}."  
     #print(msg4)
@@ -130,66 +179,202 @@ def process_trade(team_roster, players_out, players_in, partner_abbr, df):
     
     return messages
 
-
-def simulate_next_season(team_roster):
-    
-    predicted_players = []
-
-    for _, player in team_roster.roster.iterrows():
-        stats = predict_player_next_season(player)
-        stats['PLAYER_NAME'] = player['PLAYER_NAME']
-        stats['PLAYER_ID'] = player['PLAYER_ID']
-        stats['SALARY'] = player['SALARY']
-        predicted_players.append(stats)
-
-    pred_df = pd.DataFrame(predicted_players)
-
-    # Select top 8 players by predicted MIN
-    top_players = pred_df.sort_values('PTS', ascending=False).head(TOP_N_PLAYERS)
-    
-    # Normalize minutes to 240 total
-    if (top_players['MIN'].sum() > 240):
-        top_players['MIN'] = round(top_players['MIN'] / top_players['MIN'].sum() * 240, 1)
-
-    # Build feature vectors for win prediction
-    feature_vector = {}
-    for i in range(TOP_N_PLAYERS):
-        player = top_players.iloc[i]
-        feature_vector.update({
-            f'P{i+1}_PTS': player['PTS'],
-            f'P{i+1}_REB': player['REB'],
-            f'P{i+1}_OREB': player['OREB'],
-            f'P{i+1}_AST': player['AST'],
-            f'P{i+1}_STL': player['STL'],
-            f'P{i+1}_BLK': player['BLK'],
-            f'P{i+1}_TOV': player['TOV'],
-            f'P{i+1}_FG_PCT': player['FG_PCT'],
-            f'P{i+1}_FG3_PCT': player['FG3_PCT'],
-            f'P{i+1}_FG3M': player['FG3M'],
-            f'P{i+1}_FT_PCT': player['FT_PCT'],
-            #f'P{i+1}_PLUS_MINUS': player['PLUS_MINUS'],
-            f'P{i+1}_AGE': player['AGE'],
-            f'P{i+1}_MIN': player['MIN'],
-            f'P{i+1}_GP': player['GP'],
+def apply_moves(state, team_abbr, moves, df):
+    """
+    Apply an ordered list of signings ({'type': 'sign_fa', 'player', 'salary'}) and trades
+    ({'type': 'trade', 'trade_partner', 'players_out', 'players_in'}) to a LeagueState with
+    process_fa_signing / process_trade, each checked against the cap after the moves before
+    it. A move that changes no roster (cap rule failed, unknown player) stops the batch.
+    Returns (per-move results, index of the failed move or None); on failure state is
+    partly modified and must be discarded.
+    """
+    team_roster = state.team(team_abbr)
+    results = []
+    for i, move in enumerate(moves):
+        version = len(team_roster.moves)
+        if move['type'] == 'sign_fa':
+            try:
+                messages = process_fa_signing(team_roster, move['player'], move['salary'], df)
+            except IndexError:
+                messages = [f"Unknown player: {move['player']}"]
+            if len(team_roster.moves) > version:
+                state.remove_fa(move['player'])
+        else:
+            partner_roster = state.team(move['trade_partner'])
+            messages = process_trade(
+                team_roster, move['players_out'], move['players_in'], move['trade_partner'], df, partner_roster=partner_roster
+            )
+        applied = len(team_roster.moves) > version
+        results.append({'type': move['type'], 'applied': applied, 'messages': messages})
+        if not applied:
+            return results, i
+    return results, None
+
+def evaluate_trades(ledger, team_abbr, trades):
+    """
+    Validate many candidate trades against a session CapLedger without applying them.
+    trades is a list of dicts with trade_partner, players_out and players_in. Salary
+    matching for both sides is checked in one vectorized pass with process_trade's rules.
+    """
+    n = len(trades)
+    partners = [trade['trade_partner'] for trade in trades]
+
+    # Flatten every (trade, player) pair and look each contract up once
+    owners, trade_idx, outgoing_side, salaries, ppgs = [], [], [], [], []
+    missing = [[] for _ in range(n)]
+    for i, trade in enumerate(trades):
+        for side, names, owner in [(True, trade['players_out'], team_abbr), (False, trade['players_in'], trade['trade_partner'])]:
+            for name in names:
+                name = name.lower().strip()
+                contract = ledger.contract(name)
+                if contract is None or contract[0] != owner:
+                    missing[i].append(name)
+                    continue
+                trade_idx.append(i)
+                outgoing_side.append(side)
+                salaries.append(contract[1])
+                ppgs.append(ledger.ppg(name))
+
+    trade_idx = np.array(trade_idx, dtype=int)
+    outgoing_side = np.array(outgoing_side, dtype=bool)
+    salaries = np.array(salaries, dtype=float)
+    ppgs = np.array(ppgs, dtype=float)
+
+    out_salary = np.bincount(trade_idx, weights=salaries * outgoing_side, minlength=n)
+    in_salary = np.bincount(trade_idx, weights=salaries * ~outgoing_side, minlength=n)
+    out_ppg = np.bincount(trade_idx, weights=ppgs * outgoing_side, minlength=n)
+    in_ppg = np.bincount(trade_idx, weights=ppgs * ~outgoing_side, minlength=n)
+
+    user_payroll = ledger.payroll(team_abbr)
+    partner_payroll = np.array([ledger.payroll(abbr) for abbr in partners], dtype=float)
+
+    user_ok = in_salary <= max_incoming_salary(user_payroll, out_salary)
+    partner_ok = out_salary <= max_incoming_salary(partner_payroll, in_salary)
+    unrealistic = np.abs(out_ppg - in_ppg) > 10
+
+    results = []
+    for i in range(n):
+        if missing[i]:
+            messages = [f"Invalid trade: {', '.join(missing[i])} not on the expected roster."]
+        elif not user_ok[i]:
+            messages = [f"Invalid trade: incoming salary too high for {team_abbr}."]
+        elif not partner_ok[i]:
+            messages = [f"Invalid trade for {partners[i]}: incoming salary too high."]
+        else:
+            messages = []
+        results.append({
+            'valid': not messages,
+            'out_salary': round(float(out_salary[i]), 1),
+            'in_salary': round(float(in_salary[i]), 1),
+            'unrealistic': bool(unrealistic[i]),
+            'messages': messages,
         })
-
-    X = pd.DataFrame([feature_vector])
-    feature_cols = [
-        'P1_PTS', 'P1_REB', 'P1_OREB', 'P1_AST', 'P1_STL', 'P1_BLK', 'P1_TOV', 'P1_FG_PCT', 'P1_FG3_PCT', 'P1_FG3M', 'P1_FT_PCT', 'P1_AGE', 'P1_MIN', 'P1_GP',
-        'P2_PTS', 'P2_REB', 'P2_OREB', 'P2_AST', 'P2_STL', 'P2_BLK', 'P2_TOV', 'P2_FG_PCT', 'P2_FG3_PCT', 'P2_FG3M', 'P2_FT_PCT', 'P2_AGE', 'P2_MIN', 'P2_GP',
-        'P3_PTS', 'P3_REB', 'P3_OREB', 'P3_AST', 'P3_STL', 'P3_BLK', 'P3_TOV', 'P3_FG_PCT', 'P3_FG3_PCT', 'P3_FG3M', 'P3_FT_PCT', 'P3_AGE', 'P3_MIN', 'P3_GP',
-        'P4_PTS', 'P4_REB', 'P4_OREB', 'P4_AST', 'P4_STL', 'P4_BLK', 'P4_TOV', 'P4_FG_PCT', 'P4_FG3_PCT', 'P4_FG3M', 'P4_FT_PCT', 'P4_AGE', 'P4_MIN', 'P4_GP',
-        'P5_PTS', 'P5_REB', 'P5_OREB', 'P5_AST', 'P5_STL', 'P5_BLK', 'P5_TOV', 'P5_FG_PCT', 'P5_FG3_PCT', 'P5_FG3M', 'P5_FT_PCT', 'P5_AGE', 'P5_MIN', 'P5_GP',
-        'P6_PTS', 'P6_REB', 'P6_OREB', 'P6_AST', 'P6_STL', 'P6_BLK', 'P6_TOV', 'P6_FG_PCT', 'P6_FG3_PCT', 'P6_FG3M', 'P6_FT_PCT', 'P6_AGE', 'P6_MIN', 'P6_GP',
-        'P7_PTS', 'P7_REB', 'P7_OREB', 'P7_AST', 'P7_STL', 'P7_BLK', 'P7_TOV', 'P7_FG_PCT', 'P7_FG3_PCT', 'P7_FG3M', 'P7_FT_PCT', 'P7_AGE', 'P7_MIN', 'P7_GP',
-        'P8_PTS', 'P8_REB', 'P8_OREB', 'P8_AST', 'P8_STL', 'P8_BLK', 'P8_TOV', 'P8_FG_PCT', 'P8_FG3_PCT', 'P8_FG3M', 'P8_FT_PCT', 'P8_AGE', 'P8_MIN', 'P8_GP',
-        'P9_PTS', 'P9_REB', 'P9_OREB', 'P9_AST', 'P9_STL', 'P9_BLK', 'P9_TOV', 'P9_FG_PCT', 'P9_FG3_PCT', 'P9_FG3M', 'P9_FT_PCT', 'P9_AGE', 'P9_MIN', 'P9_GP'
-    ]
-    X = X[feature_cols]
-    X_tensor = torch.tensor(X.values, dtype=torch.float32)
-
+    return results
+
+def select_top_players(predicted_stats):
+    """
+    Pick the top TOP_N_PLAYERS by predicted PTS in every trial and normalize their minutes to 240.
+    predicted_stats maps stat -> (n_trials, n_players) array. Returns (top_idx, X) where X is the
+    (n_trials, TOP_N_PLAYERS, len(FEATURE_STATS)) win model encoding, zero-padded for short rosters.
+    """
+    return encode_top_players(predicted_stats)
+
+def predict_wins(X):
+    """
+    Run the win MLP once over a batch of encoded rosters (see select_top_players).
+    """
+    mlp_model = registry.get("win_model")
+    X = flatten_features(X)
+
+    # Compiled NumPy model, or the torch module when no current export exists
+    if hasattr(mlp_model, "predict"):
+        return mlp_model.predict(X)
+
+    import torch
     with torch.no_grad():
-        predicted_wins = mlp_model(X_tensor).item()
+        return mlp_model(torch.from_numpy(X)).numpy().ravel()
+
+def score_rosters(predicted_stats, roster_idx):
+    """
+    Mean predicted wins for many candidate rosters of equal size.
+    predicted_stats maps stat -> (n_trials, n_players); roster_idx is (n_rosters, roster_size)
+    player indices. Every roster is scored on the same trials (common random numbers), so
+    differences between rosters are not swamped by projection noise.
+    """
+    n_trials = predicted_stats['PTS'].shape[0]
+    chunk = max(1, SCORING_BATCH_ROWS // n_trials)
+    wins = []
+    for start in range(0, len(roster_idx), chunk):
+        idx = roster_idx[start:start + chunk]
+        stats = {
+            stat: predicted_stats[stat][:, idx].transpose(1, 0, 2).reshape(len(idx) * n_trials, idx.shape[1])
+            for stat in FEATURE_STATS
+        }
+        _, X = select_top_players(stats)
+        wins.append(predict_wins(X).reshape(len(idx), n_trials).mean(axis=1))
+    return np.concatenate(wins) if wins else np.zeros(0)
+
+def summarize_trials(roster, predicted_stats, top_idx, wins):
+    """
+    Reduce a Monte Carlo run to win percentiles and per-player stat distributions.
+    """
+    n_trials, n_players = predicted_stats['PTS'].shape
+    in_top = np.zeros((n_trials, n_players), dtype=bool)
+    np.put_along_axis(in_top, top_idx, True, axis=1)
+    top_rate = in_top.mean(axis=0)
+
+    stat_summary = {}
+    for stat in SUMMARY_STATS:
+        values = predicted_stats[stat]
+        pcts = np.percentile(values, [10, 50, 90], axis=0)
+        stat_summary[stat] = (values.mean(axis=0), pcts)
+
+    players = []
+    for j, player in enumerate(roster[['PLAYER_NAME', 'PLAYER_ID', 'SALARY']].to_dict('records')):
+        player['TOP_N_RATE'] = round(float(top_rate[j]), 3)
+        for stat, (mean, pcts) in stat_summary.items():
+            player[stat] = {
+                'mean': round(float(mean[j]), 2),
+                'p10': round(float(pcts[0, j]), 2),
+                'p50': round(float(pcts[1, j]), 2),
+                'p90': round(float(pcts[2, j]), 2),
+            }
+        players.append(player)
+    players.sort(key=lambda p: p['PTS']['mean'], reverse=True)
+
+    win_pcts = np.percentile(wins, WIN_PERCENTILES)
+    return {
+        'trials': n_trials,
+        'wins_mean': round(float(wins.mean()), 2),
+        'wins_std': round(float(wins.std()), 2),
+        'wins_percentiles': {f'p{p}': round(float(w), 2) for p, w in zip(WIN_PERCENTILES, win_pcts)},
+        'players': players,
+    }
+
+def simulate_next_season(team_roster, n_trials=None, rng=None):
+    """
+    Simulate next season for a roster. With n_trials=None, returns (predicted_wins, top_players)
+    for a single noisy draw. With n_trials=N, draws N trials at once, scores them in one MLP
+    forward pass and returns a summary dict (see summarize_trials). Pass a seeded
+    numpy Generator as rng for reproducible results.
+    """
+    roster = team_roster.roster.reset_index(drop=True)
+    predicted_stats = sample_players_next_season(roster, n_trials=n_trials or 1, rng=rng)
+    top_idx, X = select_top_players(predicted_stats)
+    wins = predict_wins(X)
+
+    if n_trials is not None:
+        return summarize_trials(roster, predicted_stats, top_idx, wins)
+
+    # Top players by predicted PTS, with minutes normalized to 240 total
+    top = top_idx[0]
+    top_players = pd.DataFrame({stat: values[0, top] for stat, values in predicted_stats.items()})
+    top_players['GP'] = top_players['GP'].astype(int)
+    top_players['MIN'] = X[0, :len(top), FEATURE_STATS.index('MIN')]
+    for col in ['PLAYER_NAME', 'PLAYER_ID', 'SALARY']:
+        top_players[col] = roster[col].to_numpy()[top]
+
+    predicted_wins = float(wins[0])
 
     '''
     print(f"\nPredicted Wins: {int(predicted_wins)}\tPredicted Losses: {82-int(predicted_wins)}")
@@ -200,19 +385,116 @@ def simulate_next_season(team_roster):
 
     return predicted_wins, top_players
 
+def _simulate_league_wins(players, team_bounds, n_trials, seed=None):
+    """
+    Wins for every team in every trial, shape (n_teams, n_trials). players is every
+    roster concatenated; team_bounds holds each team's (start, end) row range. seed is
+    anything np.random.default_rng accepts, e.g. a spawned SeedSequence per worker.
+    """
+    rng = np.random.default_rng(seed)
+    predicted_stats = sample_players_next_season(players, n_trials=n_trials, rng=rng)
+
+    encoded = [
+        select_top_players({stat: values[:, start:end] for stat, values in predicted_stats.items()})[1]
+        for start, end in team_bounds
+    ]
+
+    # One forward pass over all (n_teams * n_trials) rosters
+    return predict_wins(np.concatenate(encoded)).reshape(len(team_bounds), n_trials)
+
+def league_players(team_rosters):
+    """
+    (teams, players, team_bounds) for _simulate_league_wins: the team abbreviations, every
+    roster concatenated in that order and each team's (start, end) row range.
+    """
+    teams = list(team_rosters)
+    rosters = [team_rosters[abbr].roster for abbr in teams]
+    sizes = np.array([len(roster) for roster in rosters])
+    ends = np.cumsum(sizes)
+    team_bounds = list(zip((ends - sizes).tolist(), ends.tolist()))
+    return teams, pd.concat(rosters, ignore_index=True), team_bounds
+
+def league_trial_chunks(n_trials=None, processes=None, seed=None):
+    """
+    (trials, seed) for each chunk of a league simulation: with n_trials and processes the
+    trials are split into that many chunks, each with its own stream spawned from seed, so
+    results repeat for the same seed and processes however the chunks are run.
+    """
+    trials = n_trials or 1
+    seed_seq = np.random.SeedSequence(seed)
+    if processes and processes > 1 and trials > 1:
+        chunks = [len(chunk) for chunk in np.array_split(np.arange(trials), processes) if len(chunk)]
+        return list(zip(chunks, seed_seq.spawn(len(chunks))))
+    return [(trials, seed_seq)]
+
+def simulate_league_chunk(team_rosters, n_trials, seed):
+    """
+    Wins for every team (in team_rosters order) in one chunk of trials, shape (n_teams, n_trials).
+    """
+    _, players, team_bounds = league_players(team_rosters)
+    return _simulate_league_wins(players, team_bounds, n_trials, seed)
+
+def league_standings(teams, wins, n_trials=None):
+    """
+    Ranked standings with conference splits from the (n_teams, trials) wins of every chunk.
+    """
+    standings = []
+    for abbr, team_wins in zip(teams, wins):
+        record = {
+            'team': abbr,
+            'conference': TEAM_CONFERENCE.get(abbr),
+            'wins': round(float(team_wins.mean()), 1),
+        }
+        record['losses'] = round(82 - record['wins'], 1)
+        if n_trials is not None:
+            pcts = np.percentile(team_wins, [5, 95])
+            record['wins_std'] = round(float(team_wins.std()), 2)
+            record['wins_p5'] = round(float(pcts[0]), 1)
+            record['wins_p95'] = round(float(pcts[1]), 1)
+        standings.append(record)
+
+    standings.sort(key=lambda r: r['wins'], reverse=True)
+    conferences = {conf: [] for conf in CONFERENCES}
+    for rank, record in enumerate(standings, start=1):
+        record['rank'] = rank
+        if record['conference'] in conferences:
+            conf_standings = conferences[record['conference']]
+            record['conference_rank'] = len(conf_standings) + 1
+            conf_standings.append(record)
+
+    return {'trials': wins.shape[1], 'standings': standings, 'conferences': conferences}
+
+def simulate_league(team_rosters, n_trials=None, processes=None, seed=None):
+    """
+    Simulate every team at once. team_rosters maps team abbreviation -> TeamRoster.
+    Player projections are batched across teams and all rosters go through the MLP as one
+    batch. With n_trials and processes, trials are split across a process pool (see
+    league_trial_chunks). Returns ranked standings with conference splits.
+    """
+    teams, players, team_bounds = league_players(team_rosters)
+    chunks = league_trial_chunks(n_trials, processes, seed)
+    if len(chunks) > 1:
+        trials, seeds = zip(*chunks)
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            parts = pool.map(_simulate_league_wins, [players] * len(chunks), [team_bounds] * len(chunks), trials, seeds)
+            wins = np.concatenate(list(parts), axis=1)
+    else:
+        trials, seed_seq = chunks[0]
+        wins = _simulate_league_wins(players, team_bounds, trials, seed_seq)
+    return league_standings(teams, wins, n_trials)
+
 # Example Usage
 if __name__ == "__main__":
     
-    player_data = pd.read_csv("data/player_stats_2024-25_with_salaries.csv")
-    fa_df = pd.read_csv("data/fa_player.csv")
-    fa_list = fa_df['PLAYER_NAME'].tolist()
+    player_data = registry.get("league_table")
+    fa_list = registry.get("fa_list")
 
     team = TeamRoster("HOU", player_data, fa_list)
     team.display_roster()
 
-    # Example sequence of moves
-    process_fa_signing(team, "fred vanvleet", 20000000, player_data)
-    process_fa_signing(team, "dorian finney-smith", 12000000, player_data)
+    # Example sequence of moves (salaries in millions)
+    process_fa_signing(team, "fred vanvleet", 20, player_data)
+    process_fa_signing(team, "dorian finney-smith", 12, player_data)
     process_trade(team, ["Jalen Green", "Dillon Brooks"], ["Kevin Durant"], "PHX", player_data)
     team.display_roster()
 
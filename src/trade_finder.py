@@ -0,0 +1,82 @@
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from .predict_player_next_season_stats import sample_players_next_season
+from .simulate_team_with_offseason_moves import TOP_N_PLAYERS, evaluate_trades, score_rosters
+
+def find_trades(state, team_abbr, assets, top_k=10, n_trials=8, max_partner_players=8, rng=None):
+    """
+    Search 1-for-1 and 2-for-1 trades of the given assets with every other team and
+    return the top_k by predicted win delta.
+
+    Every player in the league is projected once; trades are checked with process_trade's
+    salary rules (evaluate_trades) and the legal ones are scored in batched MLP passes.
+    Incoming players are pruned to those projected to outscore the team's current
+    TOP_N_PLAYERS-th scorer (at most max_partner_players per partner).
+    """
+    teams = state.all_teams()
+    user_roster = teams[team_abbr].roster
+    partners = [abbr for abbr in teams if abbr != team_abbr]
+    players = pd.concat([user_roster] + [teams[abbr].roster for abbr in partners], ignore_index=True)
+    names = players['PLAYER_NAME'].tolist()
+    owners = np.array([team_abbr] * len(user_roster) + [abbr for abbr in partners for _ in range(len(teams[abbr].roster))])
+
+    predicted_stats = sample_players_next_season(players, n_trials=n_trials, rng=rng)
+    mean_pts = predicted_stats['PTS'].mean(axis=0)
+
+    user_idx = np.arange(len(user_roster))
+    assets = set(name.lower().strip() for name in assets)
+    asset_idx = [i for i in user_idx if names[i] in assets]
+
+    # Prune incoming players who would not crack the rotation
+    cutoff = np.sort(mean_pts[user_idx])[::-1][TOP_N_PLAYERS - 1] if len(user_idx) >= TOP_N_PLAYERS else -np.inf
+    incoming_idx = []
+    for abbr in partners:
+        idx = np.flatnonzero((owners == abbr) & (mean_pts > cutoff))
+        incoming_idx.extend(idx[np.argsort(-mean_pts[idx])][:max_partner_players].tolist())
+
+    out_combos = [(i, i) for i in asset_idx] + list(combinations(asset_idx, 2))
+    candidates = np.array([(out[0], out[1], j) for j in incoming_idx for out in out_combos], dtype=int).reshape(-1, 3)
+
+    trades = [
+        {
+            'trade_partner': str(owners[j]),
+            'players_out': [names[a]] if a == b else [names[a], names[b]],
+            'players_in': [names[j]],
+        }
+        for a, b, j in candidates
+    ]
+    checks = evaluate_trades(state.ledger, team_abbr, trades)
+    valid = np.array([check['valid'] for check in checks], dtype=bool)
+
+    baseline_wins = score_rosters(predicted_stats, user_idx[None, :])[0]
+
+    results = []
+    for is_single in [True, False]:
+        group = np.flatnonzero(valid & ((candidates[:, 0] == candidates[:, 1]) == is_single))
+        if len(group) == 0:
+            continue
+        outs = candidates[group]
+        keep = (user_idx[None, :] != outs[:, [0]]) & (user_idx[None, :] != outs[:, [1]])
+        kept = np.broadcast_to(user_idx, keep.shape)[keep].reshape(len(group), -1)
+        roster_idx = np.concatenate([kept, outs[:, [2]]], axis=1)
+        wins = score_rosters(predicted_stats, roster_idx)
+        for k, w in zip(group, wins):
+            results.append({
+                **trades[k],
+                'predicted_wins': round(float(w), 2),
+                'win_delta': round(float(w - baseline_wins), 2),
+                'out_salary': checks[k]['out_salary'],
+                'in_salary': checks[k]['in_salary'],
+                'unrealistic': checks[k]['unrealistic'],
+            })
+
+    results.sort(key=lambda r: r['win_delta'], reverse=True)
+    return {
+        'team': team_abbr,
+        'baseline_wins': round(float(baseline_wins), 2),
+        'trials': n_trials,
+        'candidates': len(trades),
+        'legal_candidates': int(valid.sum()),
+        'trades': results[:top_k],
+    }
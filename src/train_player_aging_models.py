@@ -1,44 +1,167 @@
-import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import KFold, cross_validate
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import argparse
+import io
 import joblib
+import numpy as np
 import os
+import time
+from .column_cache import read_table
+from .registry import AGING_STATS, aging_model_path, project_path
 
-def train_player_aging_models(data_path="data/player_aging_dataset.csv", save_dir="models/player_aging"):
-    # Load dataset
-    df = pd.read_csv(data_path)
+DEFAULT_PARAMS = {"n_estimators": 100, "max_depth": 5}
+# Rows per predict call when serving: the simulation predicts one roster at a time
+ROSTER_ROWS = 15
+
+def _stat_frame(df, stat):
+    return df[[f"{stat}_last", "AGE_last"]], df[f"{stat}_next"]
+
+def cross_validate_forest(X, y, params, folds=5, seed=42):
+    """
+    Held-out (MSE, R²) of a forest with params, averaged over k shuffled folds.
+    """
+    scores = cross_validate(
+        RandomForestRegressor(random_state=42, **params), X, y,
+        cv=KFold(n_splits=folds, shuffle=True, random_state=seed), scoring=("neg_mean_squared_error", "r2"),
+    )
+    return -scores["test_neg_mean_squared_error"].mean(), scores["test_r2"].mean()
+
+def _train_stat(df, stat, params, folds, save_dir):
+    # Runs in a worker process: cross-validate, then fit on all rows and save
+    X, y = _stat_frame(df, stat)
+    mse, r2 = cross_validate_forest(X, y, params, folds)
+    model = RandomForestRegressor(random_state=42, **params)
+    model.fit(X, y)
+    model_path = os.path.join(save_dir, f"aging_model_{stat}.joblib")
+    joblib.dump(model, model_path)
+    return model, mse, r2, model_path
 
-    stats = ["PTS_per_min", "REB_per_min", "OREB_per_min", "AST_per_min", "STL_per_min",
-             "BLK_per_min", "TOV_per_min", "FG3M"]
+def train_player_aging_models(data_path=project_path("data", "player_aging_dataset.csv"), save_dir=project_path("models", "player_aging"), params=None, folds=5, processes=None, compile_grids=True):
+    """
+    Fit and save one forest per stat, the stats in parallel processes. params maps stat to
+    RandomForestRegressor arguments (DEFAULT_PARAMS for stats not listed); the reported MSE
+    and R² are from k-fold cross-validation, not the training rows. With compile_grids the
+    serving grids are recompiled from the new forests (src/compile_aging_models.py).
+    """
+    # Load dataset
+    df = read_table(data_path)
+    params = params or {}
+    stats = AGING_STATS
     models = {}
 
     os.makedirs(save_dir, exist_ok=True)
 
     print(f"Training aging models for stats: {stats}")
 
-    for stat in stats:
-        X = df[[f"{stat}_last", "AGE_last"]]
-        y = df[f"{stat}_next"]
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count() or 1) as pool:
+        futures = {stat: pool.submit(_train_stat, df, stat, params.get(stat, DEFAULT_PARAMS), folds, save_dir) for stat in stats}
+        for stat, future in futures.items():
+            model, mse, r2, model_path = future.result()
+            print(f"{stat} model trained: {folds}-fold CV MSE = {mse:.4f}, R² = {r2:.4f}")
+            print(f"Saved {stat} model to {model_path}")
+            models[stat] = model
+
+    print("All aging models trained and saved successfully.")
 
-        model = RandomForestRegressor(n_estimators=100, max_depth=5, random_state=42)
-        model.fit(X, y)
+    # The registry serves a grid only while it matches its forest; a stale one falls back to the forest
+    if not compile_grids:
+        print("Compiled aging grids are stale until python3 -m src.compile_aging_models runs")
+    elif os.path.abspath(save_dir) != os.path.dirname(aging_model_path(stats[0])):
+        print(f"Not compiling grids: {save_dir} is not the served model directory")
+    else:
+        from .compile_aging_models import compile_aging_models
+        compile_aging_models()
+    return models
 
-        # Evaluation
-        y_pred = model.predict(X)
-        mse = mean_squared_error(y, y_pred)
-        r2 = r2_score(y, y_pred)
+def serialized_size(model):
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.tell()
 
-        print(f"{stat} model trained: MSE = {mse:.4f}, R² = {r2:.4f}")
+def predict_latency(model, X, batch_rows=ROSTER_ROWS, calls=200, seed=0):
+    """
+    (seconds per call, seconds per row) of model.predict on roster-sized slices of X, the
+    median over calls. At this size the per-call overhead dominates, which one predict over
+    all of X would average away.
+    """
+    starts = np.random.default_rng(seed).integers(0, max(len(X) - batch_rows, 0) + 1, calls)
+    batches = [X.iloc[start:start + batch_rows] for start in starts]
+    timings = []
+    for batch in batches:
+        start = time.perf_counter()
+        model.predict(batch)
+        timings.append(time.perf_counter() - start)
+    per_call = float(np.median(timings))
+    return per_call, per_call / len(batches[0])
 
-        # Save model
-        model_path = os.path.join(save_dir, f"aging_model_{stat}.joblib")
-        joblib.dump(model, model_path)
-        print(f"Saved {stat} model to {model_path}")
+def _evaluate_candidate(df, stat, params, folds):
+    # Runs in a worker process: one (stat, params) point of the search
+    from .compile_aging_models import compile_forest
+    X, y = _stat_frame(df, stat)
+    start = time.perf_counter()
+    mse, r2 = cross_validate_forest(X, y, params, folds)
+    model = RandomForestRegressor(random_state=42, **params).fit(X, y)
+    train_seconds = time.perf_counter() - start
+    grid = compile_forest(model)
+    forest_call, forest_row = predict_latency(model, X)
+    grid_call, _ = predict_latency(grid, X)
+    return {
+        "stat": stat, **params, "cv_mse": mse, "cv_r2": r2,
+        "train_seconds": train_seconds,
+        "size_kb": serialized_size(model) / 1024,
+        "forest_us_per_call": forest_call * 1e6,
+        "forest_us_per_row": forest_row * 1e6,
+        "grid_us_per_call": grid_call * 1e6,
+        "grid_cells": grid.grid.size,
+    }
 
-        models[stat] = model
+def search_aging_models(data_path=project_path("data", "player_aging_dataset.csv"), n_estimators=(10, 25, 50, 100, 200), max_depth=(3, 4, 5, 6, 8), folds=5, processes=None):
+    """
+    Cross-validate every n_estimators x max_depth forest for every stat, in parallel, and
+    record each one's serialized (joblib) size, its predict latency on roster-sized calls (the
+    forest and its compiled serving grid) and the grid's cell count next to its held-out
+    accuracy. Returns a DataFrame.
+    """
+    df = read_table(data_path)
+    candidates = [
+        (stat, {"n_estimators": n, "max_depth": depth})
+        for stat in AGING_STATS for n in n_estimators for depth in max_depth
+    ]
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(_evaluate_candidate, df, stat, params, folds) for stat, params in candidates]
+        return pd.DataFrame([future.result() for future in futures])
 
-    print("All aging models trained and saved successfully.")
-    return models
+def select_aging_models(results, r2_tolerance=0.005, min_r2=None):
+    """
+    Per stat, the smallest forest (by serialized size) whose CV R² reaches min_r2, or is
+    within r2_tolerance of that stat's best when min_r2 is None. Returns {stat: params}
+    for train_player_aging_models.
+    """
+    selected = {}
+    for stat, rows in results.groupby("stat", sort=False):
+        target = min_r2 if min_r2 is not None else rows["cv_r2"].max() - r2_tolerance
+        eligible = rows[rows["cv_r2"] >= target]
+        best = (eligible if len(eligible) else rows.nlargest(1, "cv_r2")).nsmallest(1, "size_kb").iloc[0]
+        selected[stat] = {"n_estimators": int(best["n_estimators"]), "max_depth": int(best["max_depth"])}
+    return selected
 
 if __name__ == "__main__":
-    train_player_aging_models()
+    parser = argparse.ArgumentParser(description="Train the player aging forests, or search their size/accuracy trade-off.")
+    parser.add_argument("--search", action="store_true", help="cross-validate an n_estimators x max_depth grid per stat")
+    parser.add_argument("--apply", action="store_true", help="with --search, train and save the selected forests")
+    parser.add_argument("--min-r2", type=float, default=None, help="accuracy target for the selection")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+    if args.search:
+        results = search_aging_models(processes=args.processes)
+        pd.set_option("display.width", 200)
+        print(results.round({"cv_mse": 5, "cv_r2": 4, "train_seconds": 2, "size_kb": 1,
+                             "forest_us_per_call": 1, "forest_us_per_row": 2, "grid_us_per_call": 2}).to_string(index=False))
+        selected = select_aging_models(results, min_r2=args.min_r2)
+        print("Selected:", selected)
+        if args.apply:
+            train_player_aging_models(params=selected, processes=args.processes)
+    else:
+        train_player_aging_models(processes=args.processes)
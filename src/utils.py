@@ -1,155 +1,201 @@
-import random
-import pandas as pd
 import numpy as np
+from . import registry
+
+# Age buckets used by the heuristics below: < 25, 25-30, 31-34, 35+
+AGE_BUCKET_EDGES = [25, 31, 35]
+
+# Next-season shooting percentage change per age bucket, as (probabilities, adjustments).
+# The 25-30 bucket has no +0.01 outcome: that branch of the original if/elif chain was a no-op.
+SHOOTING_TABLE = [
+    ([0.3, 0.3, 0.3, 0.1], [0.02, 0.01, 0, -0.01]),     # < 25
+    ([0.1, 0.7, 0.2], [0.02, 0, -0.01]),                # 25-30
+    ([0.1, 0.5, 0.4], [0.01, 0, -0.01]),                # 31-34
+    ([0.3, 0.35, 0.25, 0.1], [0, -0.01, -0.02, 0.01]),  # 35+
+]
+
+# Next-season change in minutes per game per age bucket, as (probabilities, deltas).
+# Young breakout candidates (>= 0.5 pts/min on < 28 min) get their own bucket, capped at 36 min.
+MINUTES_TABLE = [
+    ([0.3, 0.3, 0.2, 0.2], [2, 1, 0, -1]),   # < 25
+    ([0.3, 0.3, 0.3, 0.1], [0, 1, -1, -2]),  # 25-30: slight decline
+    ([0.4, 0.4, 0.2], [-1, -2, 0]),          # 31-34: moderate decline
+    ([0.6, 0.3, 0.1], [-3, -2, -1]),         # 35+: steeper decline
+    ([0.2, 0.3, 0.5], [10, 6, 3]),           # < 25 breakout: major / moderate / conservative leap
+]
+BREAKOUT_BUCKET = 4
+BREAKOUT_MAX_MINUTES = 36
+MAX_MINUTES = 38
+
+def _compile_table(table):
+    """
+    (cumulative thresholds, outcomes) arrays with one row per bucket, padded to equal width.
+    """
+    width = max(len(probs) for probs, _ in table)
+    thresholds = np.full((len(table), width - 1), np.inf)
+    outcomes = np.zeros((len(table), width))
+    for i, (probs, values) in enumerate(table):
+        thresholds[i, :len(probs) - 1] = np.round(np.cumsum(probs)[:-1], 10)
+        outcomes[i, :len(values)] = values
+    return thresholds, outcomes
+
+_SHOOTING = _compile_table(SHOOTING_TABLE)
+_MINUTES = _compile_table(MINUTES_TABLE)
+
+def age_bucket(age):
+    return np.digitize(age, AGE_BUCKET_EDGES)
 
-def adjust_shooting_percentage(current_pct, age):
+def sample_table(table, bucket, rng):
     """
-    Predict next-season shooting percentage for a player based on simple age-aware heuristics.
+    One draw per element of bucket (array of row indices) from a compiled table.
     """
-    adjustment = 0
-    rand_val = random.uniform(0, 1)
-
-    if age < 25:
-        if rand_val < 0.3:
-            adjustment = 0.02
-        elif rand_val < 0.6:
-            adjustment = 0.01
-        elif rand_val < 0.9:
-            adjustment = 0
-        else:
-            adjustment = -0.01
-
-    elif 25 <= age <= 30:
-        if rand_val < 0.1:
-            adjustment = 0.02
-        elif rand_val < 0.4:
-            adjustment - 0.01
-        elif rand_val < 0.8:
-            adjustment = 0.00
-        else:
-            adjustment = -0.01
-
-    elif 31 <= age <= 34:
-        if rand_val < 0.1:
-            adjustment = 0.01
-        elif rand_val < 0.6:
-            adjustment = 0.00
-        else:
-            adjustment = -0.01
-
-    else:  # age >= 35
-        if rand_val < 0.3:
-            adjustment = 0
-        elif rand_val < 0.65:
-            adjustment = -0.01
-        elif rand_val < 0.9:
-            adjustment = -0.02
-        else:
-            adjustment = 0.01
-
-    new_pct = current_pct + adjustment
-    new_pct = min(max(new_pct, 0), 1)
-    return round(new_pct, 2)
-
-def predict_minutes(minutes_last, age, pts_per_min_last):
+    thresholds, outcomes = table
+    rand_val = rng.random(bucket.shape)
+    outcome = (rand_val[..., None] >= thresholds[bucket]).sum(axis=-1)
+    return outcomes[bucket, outcome]
+
+def _generator(rng):
+    # A fresh OS-seeded stream when the caller does not pass one; never the global state
+    return rng if rng is not None else np.random.default_rng()
+
+def adjust_shooting_percentage_batch(current_pct, age, size=None, rng=None):
     """
-    Predict next-season minutes for a player based on simple age-aware heuristics.
+    Next-season shooting percentages from SHOOTING_TABLE, one independent draw per
+    element of the broadcast (or requested) shape.
     """
-    rand_val = random.uniform(0, 1)
-
-    if age < 25:
-        # Define a young breakout threshold
-        if pts_per_min_last >= 0.5 and minutes_last < 28:
-            # Breakout candidate: boost minutes aggressively
-            if rand_val < 0.2:
-                predicted = min(minutes_last + 10, 36)  # Major leap
-            elif rand_val < 0.5:
-                predicted = min(minutes_last + 6, 36)   # Moderate leap
-            else:
-                predicted = min(minutes_last + 3, 36)   # Conservative increase
-        else:
-            # Normal young player: mild changes
-            if rand_val < 0.3:
-                predicted = minutes_last + 2
-            elif rand_val < 0.6:
-                predicted = minutes_last + 1
-            elif rand_val < 0.8:
-                predicted = minutes_last
-            else:
-                predicted = minutes_last - 1
-
-    elif 25 <= age <= 30:
-        # Slight decline pattern
-        if rand_val < 0.3:
-            predicted = minutes_last
-        elif rand_val < 0.6:
-            predicted = minutes_last + 1
-        elif rand_val < 0.9:
-            predicted = minutes_last - 1
-        else:
-            predicted = minutes_last - 2
-
-    elif 31 <= age <= 34:
-        # Moderate decline
-        if rand_val < 0.4:
-            predicted = minutes_last - 1
-        elif rand_val < 0.8:
-            predicted = minutes_last - 2
-        else:
-            predicted = minutes_last
-
-    else:  # age >= 35
-        # Steeper decline
-        if rand_val < 0.6:
-            predicted = minutes_last - 3
-        elif rand_val < 0.9:
-            predicted = minutes_last - 2
-        else:
-            predicted = minutes_last - 1
+    current_pct, age = np.broadcast_arrays(np.asarray(current_pct, dtype=float), np.asarray(age))
+    shape = size if size is not None else current_pct.shape
+    adjustment = sample_table(_SHOOTING, np.broadcast_to(age_bucket(age), shape), _generator(rng))
+    return np.round(np.clip(current_pct + adjustment, 0, 1), 2)
+
+def predict_minutes_batch(minutes_last, age, pts_per_min_last, size=None, rng=None):
+    """
+    Next-season minutes from MINUTES_TABLE, one independent draw per element of the
+    broadcast (or requested) shape.
+    """
+    minutes_last, age, pts_per_min_last = np.broadcast_arrays(
+        np.asarray(minutes_last, dtype=float), np.asarray(age), np.asarray(pts_per_min_last, dtype=float)
+    )
+    shape = size if size is not None else minutes_last.shape
+    bucket = age_bucket(age)
+    is_breakout = (bucket == 0) & (pts_per_min_last >= 0.5) & (minutes_last < 28)
+    bucket = np.where(is_breakout, BREAKOUT_BUCKET, bucket)
+
+    predicted = minutes_last + sample_table(_MINUTES, np.broadcast_to(bucket, shape), _generator(rng))
+    predicted = np.where(is_breakout, np.minimum(predicted, BREAKOUT_MAX_MINUTES), predicted)
 
     # Clamp to valid NBA range
-    predicted = max(min(predicted, 38), 0)
+    return np.round(np.clip(predicted, 0, MAX_MINUTES), 1)
 
-    return round(predicted, 1)
+def adjust_shooting_percentage(current_pct, age, rng=None):
+    """
+    Predict next-season shooting percentage for a player based on simple age-aware heuristics.
+    """
+    return adjust_shooting_percentage_batch(current_pct, age, rng=rng).item()
 
+def predict_minutes(minutes_last, age, pts_per_min_last, rng=None):
+    """
+    Predict next-season minutes for a player based on simple age-aware heuristics.
+    """
+    return predict_minutes_batch(minutes_last, age, pts_per_min_last, rng=rng).item()
 
-def add_stat_variance(predicted_stat, variance=0.1):
-    scale = max(variance * abs(predicted_stat), 0.01)
-    noise = np.random.normal(0, scale)
+def add_stat_variance(predicted_stat, variance=0.1, rng=None):
+    """
+    Add gaussian noise proportional to the stat. Accepts a scalar or a numpy array
+    (one independent draw per element).
+    """
+    scale = np.maximum(variance * np.abs(predicted_stat), 0.01)
+    noise = _generator(rng).normal(0, scale)
     return predicted_stat + noise
 
 
-# Load historical player stats just once at module level
-all_years_df = pd.concat([
-    pd.read_csv(f"data/player_stats_{season}_cleaned.csv")
-    for season in ["2020-21", "2021-22", "2022-23", "2023-24", "2024-25"]
-])
+class PlayerHistoryIndex:
+    """
+    Per-player history precomputed once from all seasons' stats, keyed by normalized
+    PLAYER_NAME and by PLAYER_ID, so GP / PLUS_MINUS lookups are dict + array reads.
+    """
+    def __init__(self, history_df):
+        df = history_df.reset_index(drop=True)
 
-all_years_df['PLAYER_NAME'] = all_years_df['PLAYER_NAME'].str.lower().str.strip()
+        # Rows are in season order, so the last rows per player are the most recent seasons
+        rank_from_end = df.groupby("PLAYER_NAME", sort=False).cumcount(ascending=False)
+        last = df[rank_from_end == 0].set_index("PLAYER_NAME")
+        prev = df[rank_from_end == 1].set_index("PLAYER_NAME")["PLUS_MINUS"]
+        gp_mean = df[df["GP"] >= 30].groupby("PLAYER_NAME")["GP"].mean()
 
-def predict_gp(player_row):
-    name = player_row["PLAYER_NAME"].lower().strip()
-    history = all_years_df[all_years_df["PLAYER_NAME"] == name]
-    
-    # Filter to seasons where GP >= 30
-    history = history[history["GP"] >= 30]
+        names = last.index
+        self.n_seasons = df.groupby("PLAYER_NAME", sort=False).size().reindex(names).to_numpy()
+        self.gp_mean = gp_mean.reindex(names).to_numpy(dtype=float)
+        self.pm_last = last["PLUS_MINUS"].to_numpy(dtype=float)
+        self.pm_prev = prev.reindex(names).to_numpy(dtype=float)
 
-    if len(history) == 0:
         # Fallback if player never played 30+ games
-        return min(round(all_years_df["GP"].mean(), 0), 82)
+        self.league_gp = min(round(df["GP"].mean(), 0), 82)
+
+        self.by_name = {name: i for i, name in enumerate(names)}
+        self.by_id = {player_id: i for i, player_id in enumerate(last["PLAYER_ID"].tolist())}
+
+    def lookup(self, player_name=None, player_id=None):
+        """
+        Position of a player in the index (by name, then PLAYER_ID), or -1 if unknown.
+        """
+        if player_name is not None:
+            pos = self.by_name.get(player_name.lower().strip())
+            if pos is not None:
+                return pos
+        if player_id is not None:
+            return self.by_id.get(player_id, -1)
+        return -1
+
+    def lookup_many(self, players):
+        """
+        Positions for every row of a roster DataFrame (-1 for unknown players).
+        """
+        ids = players["PLAYER_ID"].tolist() if "PLAYER_ID" in players else [None] * len(players)
+        return np.array([
+            self.lookup(name, player_id) for name, player_id in zip(players["PLAYER_NAME"].tolist(), ids)
+        ], dtype=int)
+
+    def gp(self, pos):
+        """
+        Predicted GP for index positions (array), from seasons with GP >= 30.
+        """
+        pos = np.asarray(pos)
+        gp_mean = np.where(pos >= 0, self.gp_mean[pos], np.nan)
+        gp_mean = np.where(np.isnan(gp_mean), self.league_gp, gp_mean)
+        return np.minimum(np.round(gp_mean, 0), 82)
+
+    def plus_minus(self, pos, current_pm):
+        """
+        Predicted PLUS_MINUS for index positions (array); players with fewer than
+        two seasons of history keep their current PLUS_MINUS.
+        """
+        pos = np.asarray(pos)
+        known = pos >= 0
+        has_trend = known & (np.where(known, self.n_seasons[pos], 0) >= 2)
+        pm_last = self.pm_last[pos]
+        predicted_pm = pm_last + 0.5 * (pm_last - self.pm_prev[pos])
+        return np.round(np.where(has_trend, predicted_pm, np.asarray(current_pm, dtype=float)), 1)
 
-    gp_mean = history["GP"].mean()
-    return min(round(gp_mean, 0), 82)
+def predict_gp(player_row):
+    player_history = registry.get("player_history")
+    pos = player_history.lookup(player_row["PLAYER_NAME"], player_row.get("PLAYER_ID"))
+    return player_history.gp(pos).item()
 
 def predict_plus_minus(player_row):
-    name = player_row["PLAYER_NAME"].lower().strip()
-    history = all_years_df[all_years_df["PLAYER_NAME"] == name]
-    
-    if len(history) < 2:
-        return round(player_row["PLUS_MINUS"], 1)
-    
-    pm_last = history.iloc[-1]["PLUS_MINUS"]
-    pm_prev = history.iloc[-2]["PLUS_MINUS"]
-    delta = pm_last - pm_prev
-    predicted_pm = pm_last + (0.5 * delta) 
-    return round(predicted_pm, 1)
+    player_history = registry.get("player_history")
+    pos = player_history.lookup(player_row["PLAYER_NAME"], player_row.get("PLAYER_ID"))
+    return player_history.plus_minus(pos, player_row["PLUS_MINUS"]).item()
+
+def predict_gp_batch(players):
+    """
+    predict_gp for every row of a roster DataFrame.
+    """
+    player_history = registry.get("player_history")
+    return player_history.gp(player_history.lookup_many(players))
+
+def predict_plus_minus_batch(players):
+    """
+    predict_plus_minus for every row of a roster DataFrame.
+    """
+    player_history = registry.get("player_history")
+    return player_history.plus_minus(player_history.lookup_many(players), players["PLUS_MINUS"].to_numpy())